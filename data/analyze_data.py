@@ -1,27 +1,124 @@
-"""Gather detailed statistics for each CSV file without loading full data into memory."""
+"""Gather detailed statistics for each CSV file, loading only the columns each statistic needs."""
+import contextlib
 import csv
+import io
+import mmap
 import os
+import re
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pac
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 csv.field_size_limit(10 * 1024 * 1024)  # 10 MB field limit
 
 
+def _col_indices(header, *names):
+    """Resolve column positions once so rows can be indexed as plain lists."""
+    return [header.index(name) for name in names]
+
+
+def _read_table(fpath, *names):
+    """Parse just the named columns of a CSV as strings with pyarrow."""
+    return pac.read_csv(
+        fpath,
+        read_options=pac.ReadOptions(block_size=64 << 20),
+        parse_options=pac.ParseOptions(newlines_in_values=True),
+        convert_options=pac.ConvertOptions(
+            include_columns=list(names),
+            column_types={name: pa.string() for name in names},
+            strings_can_be_null=False,
+        ),
+    )
+
+
+def _read_columns(fpath, *names):
+    """Return the named columns as lists of strings, one list per name.
+
+    Uses pyarrow's native CSV parser (projected to just these columns) when it
+    is installed, otherwise falls back to a positional csv.reader scan.
+    """
+    if HAS_PYARROW:
+        table = _read_table(fpath, *names)
+        return [table.column(name).to_pylist() for name in names]
+
+    columns = [[] for _ in names]
+    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f)
+        indices = _col_indices(next(reader), *names)
+        appenders = [(col.append, idx) for col, idx in zip(columns, indices)]
+        for row in reader:
+            for append, idx in appenders:
+                append(row[idx])
+    return columns
+
+
+def _length_stats(fpath, name):
+    """Return (count, total, min, max) of the string lengths in one column.
+
+    Computed in a single streaming pass without keeping the values around.
+    """
+    if HAS_PYARROW:
+        lengths = pc.utf8_length(_read_table(fpath, name).column(name))
+        if not len(lengths):
+            return 0, 0, 0, 0
+        min_max = pc.min_max(lengths)
+        return (len(lengths), pc.sum(lengths).as_py(),
+                min_max["min"].as_py(), min_max["max"].as_py())
+
+    count = total = max_len = 0
+    min_len = None
+    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f)
+        idx, = _col_indices(next(reader), name)
+        for row in reader:
+            length = len(row[idx])
+            count += 1
+            total += length
+            if min_len is None or length < min_len:
+                min_len = length
+            if length > max_len:
+                max_len = length
+    return count, total, min_len or 0, max_len
+
+
+_first_field = re.compile(rb"^[^,\r\n]*(?=,)", re.M)
+
+
+def _scan_first_field(fpath):
+    """Return (row count, set of distinct first-column values) for an unquoted CSV.
+
+    Works on the raw bytes of a memory-mapped file, so it is only valid for
+    files whose fields never contain quotes, commas or newlines.
+    """
+    with open(fpath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        body_start = mm.find(b"\n") + 1
+        if not body_start:
+            return 0, set()
+        first_fields = _first_field.findall(mm, body_start)
+    return len(first_fields), set(first_fields)
+
+
+def _count_present(values):
+    """Count values that are neither empty nor the literal "NA"."""
+    return len(values) - values.count("") - values.count("NA")
+
+
 def analyze_tmi():
     """Analyze tmi.csv - Thompson Motif Index."""
     fpath = os.path.join(DATA_DIR, "tmi.csv")
-    chapters = Counter()
-    levels = Counter()
-    notes_present = 0
-    total = 0
-    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            chapters[row["chapter_name"]] += 1
-            levels[row["level"]] += 1
-            if row["notes"] and row["notes"] != "NA":
-                notes_present += 1
+    chapter_col, level_col, notes_col = _read_columns(fpath, "chapter_name", "level", "notes")
+    total = len(chapter_col)
+    chapters = Counter(chapter_col)
+    levels = Counter(level_col)
+    notes_present = _count_present(notes_col)
     print("=== tmi.csv (Thompson Motif Index) ===")
     print(f"Total motifs: {total:,}")
     print(f"Motifs with notes: {notes_present:,} ({100*notes_present/total:.1f}%)")
@@ -34,22 +131,13 @@ def analyze_tmi():
 def analyze_atu_df():
     """Analyze atu_df.csv - ATU Tale Type Index."""
     fpath = os.path.join(DATA_DIR, "atu_df.csv")
-    chapters = Counter()
-    has_litvar = 0
-    has_remarks = 0
-    has_combos = 0
-    total = 0
-    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            chapters[row["chapter"]] += 1
-            if row["litvar"] and row["litvar"] != "NA":
-                has_litvar += 1
-            if row["remarks"] and row["remarks"] != "NA":
-                has_remarks += 1
-            if row["combos"] and row["combos"] != "NA":
-                has_combos += 1
+    chapter_col, litvar_col, remarks_col, combos_col = _read_columns(
+        fpath, "chapter", "litvar", "remarks", "combos")
+    total = len(chapter_col)
+    chapters = Counter(chapter_col)
+    has_litvar = _count_present(litvar_col)
+    has_remarks = _count_present(remarks_col)
+    has_combos = _count_present(combos_col)
     print("\n=== atu_df.csv (ATU Tale Type Index) ===")
     print(f"Total tale types: {total:,}")
     print(f"With literary variants: {has_litvar:,}")
@@ -63,23 +151,13 @@ def analyze_atu_df():
 def analyze_atu_seq():
     """Analyze atu_seq.csv - ATU motif sequences."""
     fpath = os.path.join(DATA_DIR, "atu_seq.csv")
-    unique_atus = set()
-    unique_motifs = set()
-    max_order = 0
-    max_variant = 0
-    total = 0
-    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            unique_atus.add(row["atu_id"])
-            unique_motifs.add(row["motif"])
-            order = int(row["motif_order"])
-            variant = int(row["tale_variant"])
-            if order > max_order:
-                max_order = order
-            if variant > max_variant:
-                max_variant = variant
+    atu_col, motif_col, order_col, variant_col = _read_columns(
+        fpath, "atu_id", "motif", "motif_order", "tale_variant")
+    total = len(atu_col)
+    unique_atus = set(atu_col)
+    unique_motifs = set(motif_col)
+    max_order = max(map(int, order_col), default=0)
+    max_variant = max(map(int, variant_col), default=0)
     print("\n=== atu_seq.csv (ATU Motif Sequences) ===")
     print(f"Total rows: {total:,}")
     print(f"Unique ATU tale types: {len(unique_atus):,}")
@@ -91,13 +169,8 @@ def analyze_atu_seq():
 def analyze_atu_combos():
     """Analyze atu_combos.csv."""
     fpath = os.path.join(DATA_DIR, "atu_combos.csv")
-    unique_atus = set()
-    total = 0
-    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            unique_atus.add(row["atu_id"])
+    # Plain "atu_id,combos" pairs: count straight off the raw bytes
+    total, unique_atus = _scan_first_field(fpath)
     print("\n=== atu_combos.csv (ATU Combo Pairs) ===")
     print(f"Total combo pairs: {total:,}")
     print(f"Unique ATU types with combos: {len(unique_atus):,}")
@@ -106,15 +179,10 @@ def analyze_atu_combos():
 def analyze_aft():
     """Analyze aft.csv - Annotated Folktales."""
     fpath = os.path.join(DATA_DIR, "aft.csv")
-    unique_atus = set()
-    sources = Counter()
-    total = 0
-    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            unique_atus.add(row["atu_id"])
-            sources[row["data_source"]] += 1
+    atu_col, source_col = _read_columns(fpath, "atu_id", "data_source")
+    total = len(atu_col)
+    unique_atus = set(atu_col)
+    sources = Counter(source_col)
     print("\n=== aft.csv (Annotated Folktales) ===")
     print(f"Total tales: {total:,}")
     print(f"Unique ATU types covered: {len(unique_atus):,}")
@@ -126,26 +194,32 @@ def analyze_aft():
 def analyze_tropes():
     """Analyze tropes.csv."""
     fpath = os.path.join(DATA_DIR, "tropes.csv")
-    total = 0
-    desc_lengths = []
-    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            desc_lengths.append(len(row.get("Description", "")))
+    total, sum_len, min_len, max_len = _length_stats(fpath, "Description")
     print("\n=== tropes.csv (TV Tropes) ===")
     print(f"Total tropes: {total:,}")
-    if desc_lengths:
-        avg_len = sum(desc_lengths) / len(desc_lengths)
+    if total:
+        avg_len = sum_len / total
         print(f"Avg description length: {avg_len:.0f} chars")
-        print(f"Min description length: {min(desc_lengths)} chars")
-        print(f"Max description length: {max(desc_lengths):,} chars")
+        print(f"Min description length: {min_len} chars")
+        print(f"Max description length: {max_len:,} chars")
+
+
+ANALYSES = [analyze_tmi, analyze_atu_df, analyze_atu_seq,
+            analyze_atu_combos, analyze_aft, analyze_tropes]
+
+
+def _run_captured(analysis):
+    """Run one analysis in a worker and hand its printed report back as text."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        analysis()
+    return buf.getvalue()
 
 
 if __name__ == "__main__":
-    analyze_tmi()
-    analyze_atu_df()
-    analyze_atu_seq()
-    analyze_atu_combos()
-    analyze_aft()
-    analyze_tropes()
+    # Each analysis scans its own file, so run them side by side and print
+    # the reports in the usual order as they complete
+    with ProcessPoolExecutor(max_workers=len(ANALYSES)) as ex:
+        futures = [ex.submit(_run_captured, analysis) for analysis in ANALYSES]
+        for future in futures:
+            print(future.result(), end="")
@@ -8,11 +8,13 @@ DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 csv.field_size_limit(10 * 1024 * 1024)
 
 rows = []
+by_subcat = defaultdict(list)  # subcategory -> its Being rows, in file order
 with open(os.path.join(DATA_DIR, "tmi_clustered.csv"), "r", encoding="utf-8", errors="replace") as f:
     reader = csv.DictReader(f)
     for row in reader:
         if row["category"] == "Being":
             rows.append(row)
+            by_subcat[row["subcategory"]].append(row)
 
 print(f"Total Being motifs: {len(rows):,}\n")
 
@@ -20,7 +22,7 @@ subcats = ["Deity", "Human", "Animal", "Spirit", "Monster", "Witch/Sorcerer"]
 
 # Show random samples from each subcategory, stratified by chapter
 for sc in subcats:
-    sc_rows = [r for r in rows if r["subcategory"] == sc]
+    sc_rows = by_subcat[sc]
     print(f"\n{'='*80}")
     print(f"  {sc.upper()} — {len(sc_rows):,} motifs")
     print(f"{'='*80}")
@@ -54,83 +56,98 @@ print(f"\n\n{'='*80}")
 print("POTENTIAL MISCLASSIFICATIONS")
 print(f"{'='*80}")
 
-# Animals classified as Human
-print("\n--- Likely animals classified as Human ---")
-animal_words = re.compile(r"\b(fox|wolf|bear|lion|tiger|eagle|raven|crow|hawk|owl|cat[s]?\b|dog[s]?\b|horse|deer|hare|rabbit|mouse|rat|frog|toad|turtle|monkey|elephant|cow|bull|pig|boar|goat|sheep|cock|hen|duck|goose|swan|dove|ant[s]?\b|bee[s]?\b|spider|fly|whale|shark|dolphin|coyote|jackal|hyena|leopard|crocodile|lizard|scorpion|beetle|butterfly|donkey|camel|buffalo|stork|crane|sparrow|magpie|cuckoo|bat[s]?\b|squirrel|hedgehog|beaver|otter|porcupine|badger|weasel|parrot|pelican|vulture|serpent|snake)\b", re.I)
-count = 0
-for r in rows:
-    if r["subcategory"] == "Human" and animal_words.search(r["motif_name"]):
-        # Check if it's really about an animal, not just mentioning one
-        name_lower = r["motif_name"].lower()
-        if not any(w in name_lower for w in ["man", "woman", "person", "wife", "husband", "king", "queen", "prince", "princess", "boy", "girl", "child", "son", "daughter", "hero", "saint", "fool"]):
-            print(f"  {r['id']:10s} [{r['subcategory']:15s}] {r['motif_name']}")
-            count += 1
-            if count >= 20:
-                break
+# Keyword classes as whole-word sets: each name is tokenized once and every class
+# becomes a set-disjointness test instead of a long regex alternation.
+# Multi-word phrases keep a small regex since they span tokens.
+_word = re.compile(r"\w+")
+animal_words = frozenset("""
+    fox wolf bear lion tiger eagle raven crow hawk owl cat cats dog dogs horse deer hare rabbit mouse rat
+    frog toad turtle monkey elephant cow bull pig boar goat sheep cock hen duck goose swan dove ant ants
+    bee bees spider fly whale shark dolphin coyote jackal hyena leopard crocodile lizard scorpion beetle
+    butterfly donkey camel buffalo stork crane sparrow magpie cuckoo bat bats squirrel hedgehog beaver
+    otter porcupine badger weasel parrot pelican vulture serpent snake""".split())
+deity_words = frozenset("god gods goddess deity divine creator demiurg demigod".split())
+deity_phrases = re.compile(r"\bculture hero\b")
+spirit_words = frozenset("""
+    ghost ghosts spirit spirits fairy fairies elf elves dwarf dwarves demon demons devil devils angel
+    angels vampire werewolf phantom banshee goblin gnome troll trolls mermaid siren undead zombie""".split())
+monster_words = frozenset("""
+    giant giants monster monsters dragon dragons ogre ogres cannibal cyclop gorgon basilisk hydra
+    chimera minotaur""".split())
+monster_phrases = re.compile(r"\b(wild man|wild woman)\b")
+witch_words = frozenset("witch witches wizard sorcerer sorceress magician enchanter enchantress necromancer shaman".split())
+human_words = frozenset("""
+    man woman person wife husband king queen prince princess boy girl child son daughter hero saint
+    fool thief servant master lord lady priest monk nun""".split())
 
-# Deities classified as Human
-print("\n--- Likely deities classified as Human ---")
-deity_words = re.compile(r"\b(god[s]?\b|goddess|deity|divine|creator|demiurg|demigod|culture hero)\b", re.I)
-count = 0
-for r in rows:
-    if r["subcategory"] == "Human" and deity_words.search(r["motif_name"]):
-        print(f"  {r['id']:10s} [{r['subcategory']:15s}] {r['motif_name']}")
-        count += 1
-        if count >= 20:
-            break
 
-# Spirits classified as Human
-print("\n--- Likely spirits classified as Human ---")
-spirit_words = re.compile(r"\b(ghost[s]?\b|spirit[s]?\b|fairy|fairies|elf|elves|dwarf|dwarves|demon[s]?\b|devil[s]?\b|angel[s]?\b|vampire|werewolf|phantom|banshee|goblin|gnome|troll[s]?\b|mermaid|siren|undead|zombie)\b", re.I)
-count = 0
-for r in rows:
-    if r["subcategory"] == "Human" and spirit_words.search(r["motif_name"]):
-        name_lower = r["motif_name"].lower()
-        if not any(w in name_lower for w in ["man", "woman", "person", "wife", "husband", "boy", "girl"]):
-            print(f"  {r['id']:10s} [{r['subcategory']:15s}] {r['motif_name']}")
-            count += 1
-            if count >= 20:
-                break
+def _mentions(words, phrases=None):
+    """Test a row's token set (and lowercased name, for phrases) against a keyword class."""
+    def test(tokens, name_lower):
+        if not tokens.isdisjoint(words):
+            return True
+        return phrases is not None and phrases.search(name_lower) is not None
+    return test
 
-# Monsters classified as Human
-print("\n--- Likely monsters classified as Human ---")
-monster_words = re.compile(r"\b(giant[s]?\b|monster[s]?\b|dragon[s]?\b|ogre[s]?\b|cannibal|wild man|wild woman|cyclop|gorgon|basilisk|hydra|chimera|minotaur)\b", re.I)
-count = 0
-for r in rows:
-    if r["subcategory"] == "Human" and monster_words.search(r["motif_name"]):
-        name_lower = r["motif_name"].lower()
-        if not any(w in name_lower for w in ["man", "woman", "person", "wife", "husband", "boy", "girl"]):
-            print(f"  {r['id']:10s} [{r['subcategory']:15s}] {r['motif_name']}")
-            count += 1
-            if count >= 20:
-                break
 
-# Witches classified as other categories
-print("\n--- Likely witches classified wrong ---")
-witch_words = re.compile(r"\b(witch(es)?|wizard|sorcerer|sorceress|magician|enchanter|enchantress|necromancer|shaman)\b", re.I)
-count = 0
-for r in rows:
-    if r["subcategory"] != "Witch/Sorcerer" and witch_words.search(r["motif_name"]):
-        name_lower = r["motif_name"].lower()
-        # Only flag if witch/sorcerer seems primary
-        words = name_lower.split()
-        if words and any(w in words[0:3] for w in ["witch", "witches", "wizard", "sorcerer", "sorceress", "magician"]):
-            print(f"  {r['id']:10s} [{r['subcategory']:15s}] {r['motif_name']}")
-            count += 1
-            if count >= 20:
-                break
+def _no_person_word(person_words):
+    """Keep a hit only if the motif is not really about a person."""
+    return lambda name_lower, lead_words: not any(w in name_lower for w in person_words)
+
+
+def _subject_word(subject_words):
+    """Keep a hit only if one of these words appears early (subject position)."""
+    subject_words = frozenset(subject_words)
+    return lambda name_lower, lead_words: not subject_words.isdisjoint(lead_words)
+
+
+_ordinary_people = ["man", "woman", "person", "wife", "husband", "boy", "girl"]
 
-# Humans classified as Animal
-print("\n--- Likely humans classified as Animal ---")
-human_words = re.compile(r"\b(man|woman|person|wife|husband|king|queen|prince|princess|boy|girl|child|son|daughter|hero|saint|fool|thief|servant|master|lord|lady|priest|monk|nun)\b", re.I)
-count = 0
+# (heading, keyword class, subcategory filter, secondary check on the lowercased
+# name and its first three words)
+AUDITS = [
+    ("Likely animals classified as Human", _mentions(animal_words), lambda sc: sc == "Human",
+     # Check if it's really about an animal, not just mentioning one
+     _no_person_word(["man", "woman", "person", "wife", "husband", "king", "queen", "prince", "princess", "boy", "girl", "child", "son", "daughter", "hero", "saint", "fool"])),
+    ("Likely deities classified as Human", _mentions(deity_words, deity_phrases), lambda sc: sc == "Human",
+     lambda name_lower, lead_words: True),
+    ("Likely spirits classified as Human", _mentions(spirit_words), lambda sc: sc == "Human",
+     _no_person_word(_ordinary_people)),
+    ("Likely monsters classified as Human", _mentions(monster_words, monster_phrases), lambda sc: sc == "Human",
+     _no_person_word(_ordinary_people)),
+    # Only flag if witch/sorcerer seems primary
+    ("Likely witches classified wrong", _mentions(witch_words), lambda sc: sc != "Witch/Sorcerer",
+     _subject_word(["witch", "witches", "wizard", "sorcerer", "sorceress", "magician"])),
+    # Only if human word appears early (subject position)
+    ("Likely humans classified as Animal", _mentions(human_words), lambda sc: sc == "Animal",
+     _subject_word(["man", "woman", "person", "wife", "husband", "king", "queen", "prince", "princess", "boy", "girl", "child", "hero", "saint", "fool", "thief"])),
+]
+MAX_FLAGGED = 20
+
+# Resolve each audit's subcategory filter once per subcategory rather than per row
+flagged = [[] for _ in AUDITS]
+audits_for_subcat = {
+    sc: [(mentions, keep, hits) for (_, mentions, wants, keep), hits in zip(AUDITS, flagged) if wants(sc)]
+    for sc in by_subcat
+}
+
+# Single pass over the Being rows feeding every audit; stop once all are full
 for r in rows:
-    if r["subcategory"] == "Animal" and human_words.search(r["motif_name"]):
-        name_lower = r["motif_name"].lower()
-        # Only if human word appears early (subject position)
-        words = name_lower.split()
-        if words and any(w in ["man", "woman", "person", "wife", "husband", "king", "queen", "prince", "princess", "boy", "girl", "child", "hero", "saint", "fool", "thief"] for w in words[0:3]):
-            print(f"  {r['id']:10s} [{r['subcategory']:15s}] {r['motif_name']}")
-            count += 1
-            if count >= 20:
-                break
+    audits = audits_for_subcat[r["subcategory"]]
+    if not audits:
+        continue
+    # Normalize each name once; every audit reuses these
+    name_lower = r["motif_name"].lower()
+    tokens = set(_word.findall(name_lower))
+    lead_words = name_lower.split()[:3]
+    for mentions, keep, hits in audits:
+        if (len(hits) < MAX_FLAGGED and mentions(tokens, name_lower)
+                and keep(name_lower, lead_words)):
+            hits.append(r)
+    if all(len(hits) >= MAX_FLAGGED for hits in flagged):
+        break
+
+for (heading, _, _, _), hits in zip(AUDITS, flagged):
+    print(f"\n--- {heading} ---")
+    for r in hits:
+        print(f"  {r['id']:10s} [{r['subcategory']:15s}] {r['motif_name']}")
@@ -27,24 +27,52 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import SGDClassifier
 from sklearn.model_selection import cross_val_score
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pac
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 csv.field_size_limit(10 * 1024 * 1024)
 
 # =====================================================================
 # Step 1: Load motif names + chapter names (only these two columns matter)
 # =====================================================================
+def read_columns(fpath, *names):
+    """Return the named columns as lists of strings (pyarrow fast path if installed)."""
+    if HAS_PYARROW:
+        table = pac.read_csv(
+            fpath,
+            read_options=pac.ReadOptions(block_size=64 << 20),
+            parse_options=pac.ParseOptions(newlines_in_values=True),
+            convert_options=pac.ConvertOptions(
+                include_columns=list(names),
+                column_types={name: pa.string() for name in names},
+                strings_can_be_null=False,
+            ),
+        )
+        return [table.column(name).to_pylist() for name in names]
+    columns = [[] for _ in names]
+    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        appenders = [(col.append, header.index(name)) for col, name in zip(columns, names)]
+        for row in reader:
+            for append, idx in appenders:
+                append(row[idx])
+    return columns
+
+
 print("Reading motif data...")
-rows = []  # list of dicts with id, motif_name, chapter_name
-with open(os.path.join(DATA_DIR, "tmi.csv"), "r", encoding="utf-8", errors="replace") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        rows.append({
-            "id": row["id"],
-            "motif_name": row["motif_name"],
-            "chapter_name": row["chapter_name"],
-            "level": row["level"],
-        })
-print(f"  {len(rows):,} motifs loaded")
+# Parallel column lists (no per-row dicts); index i is the same motif in each
+motif_names, chapter_names = read_columns(
+    os.path.join(DATA_DIR, "tmi.csv"), "motif_name", "chapter_name")
+# Only a couple dozen distinct chapters; share one string object per chapter
+chapter_names = list(map(sys.intern, chapter_names))
+n_motifs = len(motif_names)
+print(f"  {n_motifs:,} motifs loaded")
 
 # =====================================================================
 # Step 2: Rule-based classification
@@ -138,27 +166,49 @@ RULES = [
     (re.compile(r"\b(culture hero|fairy|fairies|dwarfs?|elves?|giants?|ogres?|trolls?|dragons?|mermaids?)\b"), "Being"),
 ]
 
+# Rules that only test the leading word ("^tabu\b", "^(king|queen|...)\b") are
+# folded into one dict keyed on that word, so each motif needs a single lookup
+# for all of them; only the remaining rules run as regexes. FIRST_WORD_RULE maps
+# a leading word to the index of the earliest such rule, which keeps the
+# first-match-wins priority of RULES intact.
+# The general rules deliberately stay one search each: fusing them into a single
+# "(?P<r0>...)|(?P<r1>...)" alternation returns the leftmost match in the text
+# rather than the highest-priority rule, and with re's backtracking engine the
+# fused pattern was also over twice as slow on tmi.csv.
+_leading_word = re.compile(r"\w*")
+FIRST_WORD_RULE = {}
+GENERAL_RULES = []  # (index into RULES, compiled_regex, category)
+for _i, (_pattern, _category) in enumerate(RULES):
+    _words = re.fullmatch(r"\^\(?([a-z|]+)\)?\\b", _pattern.pattern)
+    if _words:
+        for _word in _words.group(1).split("|"):
+            FIRST_WORD_RULE.setdefault(_word, _i)
+    else:
+        GENERAL_RULES.append((_i, _pattern, _category))
+
+
 def classify_rule(motif_name):
     """Return category if a rule matches, else None."""
     lower = motif_name.lower()
-    for pattern, category in RULES:
+    first_word_hit = FIRST_WORD_RULE.get(_leading_word.match(lower).group(), len(RULES))
+    for i, pattern, category in GENERAL_RULES:
+        if i > first_word_hit:
+            break
         if pattern.search(lower):
             return category
+    if first_word_hit < len(RULES):
+        return RULES[first_word_hit][1]
     return None
 
 
 print("Applying rule-based classification...")
-categories = []
-rule_matched = 0
-for r in rows:
-    cat = classify_rule(r["motif_name"])
-    categories.append(cat)
-    if cat:
-        rule_matched += 1
-
-print(f"  Rule-matched: {rule_matched:,} / {len(rows):,} ({100*rule_matched/len(rows):.1f}%)")
-unmatched = sum(1 for c in categories if c is None)
-print(f"  Unmatched: {unmatched:,} ({100*unmatched/len(rows):.1f}%)")
+# One column-wide pass: map() drives classify_rule over every name at C level
+categories = list(map(classify_rule, motif_names))
+unmatched = categories.count(None)
+rule_matched = len(categories) - unmatched
+
+print(f"  Rule-matched: {rule_matched:,} / {n_motifs:,} ({100*rule_matched/n_motifs:.1f}%)")
+print(f"  Unmatched: {unmatched:,} ({100*unmatched/n_motifs:.1f}%)")
 
 # =====================================================================
 # Step 3: Train a classifier on rule-labeled data, predict the rest
@@ -171,7 +221,9 @@ def preprocess(name):
     return re.sub(r"\s+", " ", name).strip()
 
 # Add chapter as a feature by appending it
-texts_all = [preprocess(r["motif_name"]) + " __CH_" + r["chapter_name"].replace(" ", "_") for r in rows]
+# Streamed straight into the vectorizer rather than materialized as a list
+texts_all = (preprocess(name) + " __CH_" + chapter.replace(" ", "_")
+             for name, chapter in zip(motif_names, chapter_names))
 
 vectorizer = TfidfVectorizer(
     max_features=10000,
@@ -183,26 +235,30 @@ vectorizer = TfidfVectorizer(
 X_all = vectorizer.fit_transform(texts_all)
 
 # Split into labeled and unlabeled
-labeled_idx = [i for i, c in enumerate(categories) if c is not None]
-unlabeled_idx = [i for i, c in enumerate(categories) if c is None]
+labels = np.array(categories, dtype=object)
+is_labeled = np.fromiter((c is not None for c in categories), dtype=bool, count=n_motifs)
+labeled_idx = np.flatnonzero(is_labeled)
+unlabeled_idx = np.flatnonzero(~is_labeled)
 
 X_labeled = X_all[labeled_idx]
-y_labeled = [categories[i] for i in labeled_idx]
+y_labeled = labels[labeled_idx]
 
 # Cross-validate
-clf = SGDClassifier(loss="modified_huber", random_state=42, max_iter=1000, class_weight="balanced")
-cv_scores = cross_val_score(clf, X_labeled, y_labeled, cv=5, scoring="accuracy")
+clf = SGDClassifier(loss="modified_huber", random_state=42, max_iter=1000, class_weight="balanced",
+                    n_jobs=-1)
+cv_scores = cross_val_score(clf, X_labeled, y_labeled, cv=5, scoring="accuracy", n_jobs=-1)
 print(f"  5-fold CV accuracy on rule-labeled data: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
 
 # Train on all labeled, predict unlabeled
 clf.fit(X_labeled, y_labeled)
-if unlabeled_idx:
+if unlabeled_idx.size:
     X_unlabeled = X_all[unlabeled_idx]
     preds = clf.predict(X_unlabeled)
     pred_proba = clf.predict_proba(X_unlabeled)
 
-    for j, idx in enumerate(unlabeled_idx):
-        categories[idx] = preds[j]
+    # Plain interned str labels (not numpy str_), shared with the rule labels
+    labels[unlabeled_idx] = [sys.intern(pred) for pred in preds.tolist()]
+    categories = labels.tolist()
 
     # Report confidence
     max_probs = pred_proba.max(axis=1)
@@ -217,14 +273,18 @@ print("\n" + "=" * 80)
 print("CATEGORY DISTRIBUTION")
 print("=" * 80)
 
-cat_counts = Counter(categories)
-for cat, count in cat_counts.most_common():
-    print(f"  {cat:15s}  {count:>6,}  ({100*count/len(rows):.1f}%)")
-
-# Category × Chapter cross-tabulation
+# Counts, Category × Chapter cross-tabulation and report samples in one sweep
+cat_counts = Counter()
 cat_chapter = defaultdict(Counter)
-for r, cat in zip(rows, categories):
-    cat_chapter[cat][r["chapter_name"]] += 1
+cat_samples = defaultdict(list)
+for name, chapter, cat in zip(motif_names, chapter_names, categories):
+    cat_counts[cat] += 1
+    cat_chapter[cat][chapter] += 1
+    if len(cat_samples[cat]) < 15:
+        cat_samples[cat].append(name)
+
+for cat, count in cat_counts.most_common():
+    print(f"  {cat:15s}  {count:>6,}  ({100*count/n_motifs:.1f}%)")
 
 # =====================================================================
 # Step 5: Detailed per-category report
@@ -235,8 +295,8 @@ report_lines.append("=" * 80)
 report_lines.append("")
 report_lines.append("Categories assigned via rule-based pattern matching on motif names,")
 report_lines.append("with a TF-IDF + SGD classifier extending to unmatched motifs.")
-report_lines.append(f"Rule-matched: {rule_matched:,} / {len(rows):,} ({100*rule_matched/len(rows):.1f}%)")
-report_lines.append(f"Classifier-predicted: {len(rows)-rule_matched:,} ({100*(len(rows)-rule_matched)/len(rows):.1f}%)")
+report_lines.append(f"Rule-matched: {rule_matched:,} / {n_motifs:,} ({100*rule_matched/n_motifs:.1f}%)")
+report_lines.append(f"Classifier-predicted: {n_motifs-rule_matched:,} ({100*(n_motifs-rule_matched)/n_motifs:.1f}%)")
 report_lines.append(f"Classifier 5-fold CV accuracy: {cv_scores.mean():.3f}")
 report_lines.append("")
 
@@ -254,7 +314,7 @@ CATEGORY_DESCRIPTIONS = {
 
 for cat, count in cat_counts.most_common():
     report_lines.append(f"\n{'─'*80}")
-    report_lines.append(f"  {cat.upper()}  —  {count:,} motifs ({100*count/len(rows):.1f}%)")
+    report_lines.append(f"  {cat.upper()}  —  {count:,} motifs ({100*count/n_motifs:.1f}%)")
     report_lines.append(f"  {CATEGORY_DESCRIPTIONS.get(cat, '')}")
     report_lines.append(f"{'─'*80}")
 
@@ -263,9 +323,8 @@ for cat, count in cat_counts.most_common():
     report_lines.append(f"  Top chapters: {', '.join(f'{ch} ({n:,})' for ch, n in top_ch)}")
 
     # Sample motifs
-    samples = [r["motif_name"] for r, c in zip(rows, categories) if c == cat][:15]
     report_lines.append(f"  Sample motifs:")
-    for s in samples:
+    for s in cat_samples[cat]:
         report_lines.append(f"    • {s}")
 
 report_lines.append(f"\n{'='*80}")
@@ -273,8 +332,7 @@ report_lines.append("CATEGORY × CHAPTER CROSS-TABULATION")
 report_lines.append(f"{'='*80}")
 
 # Get all chapters sorted by frequency
-all_chapters = sorted(set(r["chapter_name"] for r in rows),
-                      key=lambda ch: -sum(1 for r in rows if r["chapter_name"] == ch))
+all_chapters = [ch for ch, _ in Counter(chapter_names).most_common()]
 all_cats = [cat for cat, _ in cat_counts.most_common()]
 
 report_lines.append(f"\n{'':20s} " + " ".join(f"{cat:>10s}" for cat in all_cats))
@@ -294,12 +352,11 @@ print("Writing tmi_clustered.csv ...")
 out_path = os.path.join(DATA_DIR, "tmi_clustered.csv")
 with open(os.path.join(DATA_DIR, "tmi.csv"), "r", encoding="utf-8", errors="replace") as fin, \
      open(out_path, "w", encoding="utf-8", newline="") as fout:
-    reader = csv.DictReader(fin)
-    fieldnames = reader.fieldnames + ["category"]
-    writer = csv.DictWriter(fout, fieldnames=fieldnames)
-    writer.writeheader()
-    for i, row in enumerate(reader):
-        row["category"] = categories[i]
+    reader = csv.reader(fin)
+    writer = csv.writer(fout)
+    writer.writerow(next(reader) + ["category"])
+    for row, cat in zip(reader, categories):
+        row.append(cat)
         writer.writerow(row)
 print(f"  Written {out_path}")
 
@@ -321,7 +378,7 @@ ax.set_title("TMI Motifs by Semantic Category")
 ax.invert_yaxis()
 for bar, size in zip(bars, cat_sizes):
     ax.text(bar.get_width() + 80, bar.get_y() + bar.get_height() / 2,
-            f"{size:,} ({100*size/len(rows):.1f}%)", va="center", fontsize=9)
+            f"{size:,} ({100*size/n_motifs:.1f}%)", va="center", fontsize=9)
 plt.tight_layout()
 plt.savefig(os.path.join(DATA_DIR, "cluster_distribution.png"), dpi=150)
 print("  Written cluster_distribution.png")
@@ -347,13 +404,11 @@ ax2.set_yticklabels(top_chapters, fontsize=10)
 ax2.set_title("Category Proportion by TMI Chapter (row-normalized)")
 plt.colorbar(im, ax=ax2, shrink=0.8, label="Proportion")
 
-# Annotate cells with counts
-for i in range(len(top_chapters)):
-    for j in range(len(all_cats)):
-        val = int(matrix[i, j])
-        if val > 0:
-            color = "white" if matrix_norm[i, j] > 0.4 else "black"
-            ax2.text(j, i, f"{val}", ha="center", va="center", fontsize=7, color=color)
+# Annotate non-empty cells with counts
+text_colors = np.where(matrix_norm > 0.4, "white", "black")
+for i, j in np.argwhere(matrix > 0):
+    ax2.text(j, i, f"{int(matrix[i, j])}", ha="center", va="center", fontsize=7,
+             color=text_colors[i, j])
 
 plt.tight_layout()
 plt.savefig(os.path.join(DATA_DIR, "category_by_chapter.png"), dpi=150)
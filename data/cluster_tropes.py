@@ -15,7 +15,9 @@ Outputs:
   - tropes_scatter_grid.png        : per-category UMAP grid
 """
 import csv
+import hashlib
 import os
+import pickle
 import re
 import sys
 from collections import Counter, defaultdict
@@ -25,10 +27,29 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.patheffects as pe
 import numpy as np
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import SGDClassifier
 from sklearn.model_selection import cross_val_score
 import umap
+from pynndescent import NNDescent
+
+from scatter_layers import plot_points
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pac
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    # Optional: pip install google-re2 (prebuilt wheels for CPython on
+    # Linux/macOS/Windows); without it the stdlib re patterns are used
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    HAS_RE2 = False
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 csv.field_size_limit(10 * 1024 * 1024)
@@ -36,46 +57,104 @@ csv.field_size_limit(10 * 1024 * 1024)
 # =====================================================================
 # Step 1: Load unique tropes
 # =====================================================================
-print("Loading tropes.csv (unique tropes only) ...")
-seen_ids = set()
-trope_ids = []
-trope_names = []
-trope_descs = []
-
-with open(os.path.join(DATA_DIR, "tropes.csv"), "r", encoding="utf-8", errors="replace") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        tid = row["TropeID"]
-        if tid in seen_ids:
-            continue
-        seen_ids.add(tid)
-        trope_ids.append(tid)
-        trope_names.append(row["Trope"])
-        trope_descs.append(row.get("Description", ""))
+def read_first_rows(fpath, key, *names):
+    """Return the named columns (as lists of strings) for the first row of each key.
+
+    With pyarrow installed the file is parsed natively, projected to these
+    columns, and only the first-occurrence rows are converted to Python strings;
+    otherwise a positional csv.reader scan skips repeated keys as it goes.
+    """
+    if HAS_PYARROW:
+        wanted = list(dict.fromkeys((key, *names)))
+        table = pac.read_csv(
+            fpath,
+            read_options=pac.ReadOptions(block_size=64 << 20),
+            parse_options=pac.ParseOptions(newlines_in_values=True),
+            convert_options=pac.ConvertOptions(
+                include_columns=wanted,
+                column_types={name: pa.string() for name in wanted},
+                strings_can_be_null=False,
+            ),
+        )
+        first_row = {}
+        for i, value in enumerate(table.column(key).to_pylist()):
+            if value not in first_row:
+                first_row[value] = i
+        table = table.take(pa.array(list(first_row.values()), type=pa.int64()))
+        return [table.column(name).to_pylist() for name in names]
+    columns = [[] for _ in names]
+    seen = set()
+    with open(fpath, "r", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        key_idx = header.index(key)
+        appenders = [(col.append, header.index(name)) for col, name in zip(columns, names)]
+        for row in reader:
+            if row[key_idx] in seen:
+                continue
+            seen.add(row[key_idx])
+            for append, idx in appenders:
+                append(row[idx])
+    return columns
+
+
+TROPES_CSV = os.path.join(DATA_DIR, "tropes.csv")
+# Steps 1-3 depend only on tropes.csv and the rules in this script, so their
+# results are cached; the key covers the CSV's size/mtime and this file's source
+RULE_CACHE = os.path.join(DATA_DIR, ".tropes_rule_cache.pkl")
+
+def rule_cache_key():
+    st = os.stat(TROPES_CSV)
+    h = hashlib.blake2b(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    with open(os.path.abspath(__file__), "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+cache_key = rule_cache_key()
+cached = None
+if os.path.exists(RULE_CACHE):
+    with open(RULE_CACHE, "rb") as f:
+        saved_key, payload = pickle.load(f)
+    if saved_key == cache_key:
+        cached = payload
+
+if cached is not None:
+    print("Loading cached rule results (tropes.csv and rules unchanged) ...")
+    trope_ids, trope_names, split_names, short_descs, categories = cached
+else:
+    print("Loading tropes.csv (unique tropes only) ...")
+    # tropes.csv has one row per (trope, work); keep the first row of each trope
+    trope_ids, trope_names, trope_descs = read_first_rows(
+        TROPES_CSV, "TropeID", "TropeID", "Trope", "Description")
 
 print(f"  {len(trope_ids):,} unique tropes loaded")
 
 # =====================================================================
 # Step 2: Preprocess trope names (split CamelCase)
 # =====================================================================
+# One pass over zero-width boundaries: lower->Upper, and before the last
+# capital of an acronym that starts a new word ("HTMLParser" -> "HTML Parser")
+_camel_boundary = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
 def split_camel(name):
     """Split CamelCase into lowercase words."""
-    parts = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
-    parts = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', parts)
-    return parts.lower()
+    return _camel_boundary.sub(" ", name).lower()
 
-split_names = [split_camel(n) for n in trope_names]
+if cached is None:
+    split_names = [split_camel(n) for n in trope_names]
 
 # Truncate descriptions to first ~300 chars for efficiency
 def truncate_desc(desc, max_chars=300):
-    desc = desc.strip().replace("\n", " ")
-    desc = re.sub(r"\s+", " ", desc)
+    # str.split() collapses the same whitespace set as \s+, strip included
+    desc = " ".join(desc.split())
     if len(desc) > max_chars:
         # Cut at word boundary
         desc = desc[:max_chars].rsplit(" ", 1)[0]
     return desc.lower()
 
-short_descs = [truncate_desc(d) for d in trope_descs]
+if cached is None:
+    short_descs = [truncate_desc(d) for d in trope_descs]
+    del trope_descs
 
 # =====================================================================
 # Step 3: Rule-based classification
@@ -188,25 +267,66 @@ RULES = [
     (re.compile(r"\b(healing|resurrection|necromancy|summoning|conjur|enchant|illusion|mind control)\b"), "Power/Ability"),
 ]
 
+# Most rules are plain "\b(word|word|...)\b" lists. Their single words are folded
+# into one dict keyed on the word, so a trope's tokens are looked up once for all
+# of them; KEYWORD_RULE maps a word to the index of the earliest rule listing it,
+# which keeps the first-match-wins priority of RULES intact. Multi-word phrases
+# from those lists and all other rules still run as regexes. (A single fused
+# "(?P<g0>...)|(?P<g1>...)" alternation would report the leftmost match in the
+# text rather than the highest-priority rule, and is slower under re.)
+_token = re.compile(r"\w+")
+KEYWORD_RULE = {}
+GENERAL_RULES = []  # (index into RULES, compiled_regex, category)
+for _i, (_pattern, _category) in enumerate(RULES):
+    _alts = re.fullmatch(r"\\b\(([a-z |]+)\)\\b", _pattern.pattern)
+    if not _alts:
+        GENERAL_RULES.append((_i, _pattern, _category))
+        continue
+    _phrases = []
+    for _alt in _alts.group(1).split("|"):
+        if " " in _alt:
+            _phrases.append(_alt)
+        else:
+            KEYWORD_RULE.setdefault(_alt, _i)
+    if _phrases:
+        GENERAL_RULES.append((_i, re.compile(r"\b(" + "|".join(_phrases) + r")\b"), _category))
+
+# RE2 (linear-time DFA) runs the general rules about twice as fast when installed.
+# Its \b only knows ASCII word characters, so it is used for ASCII text only;
+# anything else keeps the Unicode-aware stdlib patterns.
+if HAS_RE2:
+    ASCII_GENERAL_RULES = [(i, re2.compile(p.pattern), cat) for i, p, cat in GENERAL_RULES]
+else:
+    ASCII_GENERAL_RULES = GENERAL_RULES
+
+
 def classify_rule(name_split, desc_short):
     """Return category if a rule matches, else None."""
     text = name_split + " " + desc_short
-    for pattern, category in RULES:
+    keyword_hit = min((KEYWORD_RULE[w] for w in set(_token.findall(text)) if w in KEYWORD_RULE),
+                      default=len(RULES))
+    general_rules = ASCII_GENERAL_RULES if text.isascii() else GENERAL_RULES
+    for i, pattern, category in general_rules:
+        if i > keyword_hit:
+            break
         if pattern.search(text):
             return category
+    if keyword_hit < len(RULES):
+        return RULES[keyword_hit][1]
     return None
 
-print("Applying rule-based classification ...")
-categories = []
-rule_matched = 0
-for name_s, desc_s in zip(split_names, short_descs):
-    cat = classify_rule(name_s, desc_s)
-    categories.append(cat)
-    if cat:
-        rule_matched += 1
+if cached is None:
+    print("Applying rule-based classification ...")
+    categories = list(map(classify_rule, split_names, short_descs))
+    tmp = RULE_CACHE + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((cache_key, (trope_ids, trope_names, split_names, short_descs, categories)),
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, RULE_CACHE)
+unmatched = categories.count(None)
+rule_matched = len(categories) - unmatched
 
 print(f"  Rule-matched: {rule_matched:,} / {len(trope_ids):,} ({100*rule_matched/len(trope_ids):.1f}%)")
-unmatched = sum(1 for c in categories if c is None)
 print(f"  Unmatched: {unmatched:,} ({100*unmatched/len(trope_ids):.1f}%)")
 
 # =====================================================================
@@ -215,34 +335,41 @@ print(f"  Unmatched: {unmatched:,} ({100*unmatched/len(trope_ids):.1f}%)")
 print("\nTraining classifier on rule-labeled tropes ...")
 
 # Combine name (repeated for weight) + short description
-texts_all = [split_names[i] + " " + split_names[i] + " " + short_descs[i] for i in range(len(trope_ids))]
+# Streamed straight into the vectorizer rather than materialized as a list; the
+# f-string builds each text in one allocation instead of four chained concats
+texts_all = (f"{name_s} {name_s} {desc_s}" for name_s, desc_s in zip(split_names, short_descs))
 
 vectorizer = TfidfVectorizer(
     max_features=15000, ngram_range=(1, 2),
-    min_df=2, max_df=0.4, sublinear_tf=True,
-    stop_words="english",
+    min_df=5, max_df=0.4, sublinear_tf=True,
+    stop_words="english", dtype=np.float32,
 )
 X_all = vectorizer.fit_transform(texts_all)
+# Only X_all is needed from here on; drop the fitted vocabulary and the (much
+# larger) stop_words_ set of every pruned n-gram before training and UMAP
+del vectorizer
 
-labeled_idx = [i for i, c in enumerate(categories) if c is not None]
-unlabeled_idx = [i for i, c in enumerate(categories) if c is None]
+labels = np.array(categories, dtype=object)
+is_labeled = np.fromiter((c is not None for c in categories), dtype=bool, count=len(categories))
+unlabeled_idx = np.flatnonzero(~is_labeled)
 
-X_labeled = X_all[labeled_idx]
-y_labeled = [categories[i] for i in labeled_idx]
+X_labeled = X_all[is_labeled]
+y_labeled = labels[is_labeled]
 
-clf = SGDClassifier(loss="modified_huber", random_state=42, max_iter=1000, class_weight="balanced")
-cv_scores = cross_val_score(clf, X_labeled, y_labeled, cv=5, scoring="accuracy")
+clf = SGDClassifier(loss="modified_huber", random_state=42, max_iter=1000, class_weight="balanced",
+                    n_jobs=-1)
+cv_scores = cross_val_score(clf, X_labeled, y_labeled, cv=5, scoring="accuracy", n_jobs=-1)
 print(f"  5-fold CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
 
 clf.fit(X_labeled, y_labeled)
-if unlabeled_idx:
-    X_unlabeled = X_all[unlabeled_idx]
+if unlabeled_idx.size:
+    X_unlabeled = X_all[~is_labeled]
     preds = clf.predict(X_unlabeled)
     pred_proba = clf.predict_proba(X_unlabeled)
     max_probs = pred_proba.max(axis=1)
 
-    for j, idx in enumerate(unlabeled_idx):
-        categories[idx] = preds[j]
+    labels[unlabeled_idx] = preds.tolist()
+    categories = labels.tolist()
 
     print(f"  Predicted {len(unlabeled_idx):,} unlabeled tropes")
     print(f"  Confidence: mean={max_probs.mean():.3f}, median={np.median(max_probs):.3f}, min={max_probs.min():.3f}")
@@ -312,19 +439,19 @@ print(f"\nWritten {report_path}")
 print("Writing tropes_clustered.csv ...")
 
 # Build lookup: TropeID -> category
-id_to_cat = {}
-for i, tid in enumerate(trope_ids):
-    id_to_cat[tid] = categories[i]
+id_to_cat = dict(zip(trope_ids, categories))
 
+# Rows are copied positionally with the category appended; no per-row dicts
 out_path = os.path.join(DATA_DIR, "tropes_clustered.csv")
 with open(os.path.join(DATA_DIR, "tropes.csv"), "r", encoding="utf-8", errors="replace") as fin, \
      open(out_path, "w", encoding="utf-8", newline="") as fout:
-    reader = csv.DictReader(fin)
-    fieldnames = reader.fieldnames + ["category"]
-    writer = csv.DictWriter(fout, fieldnames=fieldnames)
-    writer.writeheader()
+    reader = csv.reader(fin)
+    writer = csv.writer(fout)
+    header = next(reader)
+    id_col = header.index("TropeID")
+    writer.writerow(header + ["category"])
     for row in reader:
-        row["category"] = id_to_cat.get(row["TropeID"], "")
+        row.append(id_to_cat.get(row[id_col], ""))
         writer.writerow(row)
 print(f"  Written {out_path}")
 
@@ -349,6 +476,12 @@ COLORS = {
 
 CATEGORY_ORDER = [cat for cat, _ in cat_counts.most_common()]
 cat_arr = np.array(categories)
+# Point indices per category from one stable sort, instead of a full
+# cat_arr == cat scan for every category in every plot
+cat_values, cat_codes = np.unique(cat_arr, return_inverse=True)
+cat_groups = dict(zip(cat_values.tolist(),
+                      np.split(np.argsort(cat_codes, kind="stable"),
+                               np.cumsum(np.bincount(cat_codes))[:-1])))
 
 # 8a. Bar chart
 print("Plotting bar chart ...")
@@ -374,21 +507,32 @@ print("  Written tropes_cluster_distribution.png")
 
 # 8b. UMAP
 print("Running UMAP on tropes (this will take a moment) ...")
+# UMAP's neighbor search scales with the input dimension, so project the
+# 15k-column TF-IDF matrix onto its top 100 components first
+X_svd = TruncatedSVD(n_components=100, random_state=42).fit_transform(X_all)
+
+# Build the k-NN graph up front on all cores; with random_state set UMAP would
+# otherwise run its own neighbor search single-threaded
+knn_index = NNDescent(X_svd, n_neighbors=25, metric="cosine", random_state=42,
+                      low_memory=True, n_jobs=-1)
+knn_indices, knn_dists = knn_index.neighbor_graph
 reducer = umap.UMAP(
     n_components=2, n_neighbors=25, min_dist=0.25,
     metric="cosine", random_state=42, low_memory=True,
+    precomputed_knn=(knn_indices, knn_dists, knn_index),
 )
-coords = reducer.fit_transform(X_all)
+coords = reducer.fit_transform(X_svd)
 print(f"  UMAP done. Shape: {coords.shape}")
 
+x, y = coords[:, 0], coords[:, 1]
+
 # 8c. All categories scatter
 print("Plotting combined scatter ...")
 fig, ax = plt.subplots(figsize=(16, 11))
 for cat in reversed(CATEGORY_ORDER):
-    mask = cat_arr == cat
-    ax.scatter(coords[mask, 0], coords[mask, 1],
-               c=COLORS.get(cat, "#999"), label=f"{cat} ({mask.sum():,})",
-               s=2, alpha=0.4, edgecolors="none", rasterized=True)
+    idx = cat_groups[cat]
+    plot_points(ax, x[idx], y[idx], COLORS.get(cat, "#999"), size=2, alpha=0.4,
+                label=f"{cat} ({len(idx):,})")
 
 ax.set_title("TV Tropes — Semantic Categories (UMAP projection)", fontsize=14, fontweight="bold")
 ax.set_xlabel("UMAP 1")
@@ -408,15 +552,21 @@ ncols = 4
 nrows = 3
 fig, axes = plt.subplots(nrows, ncols, figsize=(22, 15))
 
+# The faint grey context layer only needs the overall shape of the layout, so
+# every panel shares one random subsample (category points are drawn on top)
+GRID_BACKGROUND_POINTS = 20_000
+if len(coords) > GRID_BACKGROUND_POINTS:
+    background = np.sort(np.random.default_rng(0).choice(len(coords), GRID_BACKGROUND_POINTS, replace=False))
+else:
+    background = slice(None)
+
 for idx, cat in enumerate(CATEGORY_ORDER):
     r, c = divmod(idx, ncols)
     ax = axes[r][c]
-    mask = cat_arr == cat
-    ax.scatter(coords[~mask, 0], coords[~mask, 1],
-               c="#e8e8e8", s=0.3, alpha=0.15, edgecolors="none", rasterized=True)
-    ax.scatter(coords[mask, 0], coords[mask, 1],
-               c=COLORS.get(cat, "#999"), s=2.5, alpha=0.6, edgecolors="none", rasterized=True)
-    ax.set_title(f"{cat}  ({mask.sum():,})", fontsize=12, fontweight="bold",
+    members = cat_groups[cat]
+    plot_points(ax, x[background], y[background], "#e8e8e8", size=0.3, alpha=0.15)
+    plot_points(ax, x[members], y[members], COLORS.get(cat, "#999"), size=2.5, alpha=0.6)
+    ax.set_title(f"{cat}  ({len(members):,})", fontsize=12, fontweight="bold",
                  color=COLORS.get(cat, "#999"),
                  path_effects=[pe.withStroke(linewidth=0.5, foreground="black")])
     ax.set_xticks([])
@@ -11,12 +11,16 @@ Outputs:
   - tmi_clustered.csv              : full TMI with improved category + subcategory labels
   - rf_classification_report.txt   : accuracy metrics and analysis
 """
+import asyncio
+import contextlib
 import csv
-import json
+import hashlib
+import operator
 import os
 import re
+import shelve
 import sys
-import time
+import warnings
 from collections import Counter, defaultdict
 
 import numpy as np
@@ -24,41 +28,82 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import cross_val_score
 
+from motif_rules import (ANIMAL_NAMES, DEITY_NAMES, HAS_RE2, anywhere, has_any_word,
+                         search_anywhere, search_set)
+
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     HAS_REQUESTS = True
 except ImportError:
     HAS_REQUESTS = False
     print("WARNING: requests not available — ollama validation will be skipped")
 
+try:
+    # Parses the ollama replies straight from bytes, several times faster than json
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 csv.field_size_limit(10 * 1024 * 1024)
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_URL = "http://localhost:11434/api/chat"
 OLLAMA_MODEL = "mistral-small3.1"
+# Ollama batches in flight at once. Match the server's OLLAMA_NUM_PARALLEL
+# setting, or the extra requests just queue server-side.
+OLLAMA_NUM_PARALLEL = 8
+# Motifs per ollama request, and the hard cap that keeps a prompt inside the
+# model's context window
+OLLAMA_BATCH_SIZE = 64
+OLLAMA_MAX_BATCH = 128
+# Labels ollama has already returned, per (model, task, label set, motif name)
+OLLAMA_CACHE = os.path.join(DATA_DIR, ".ollama_cache")
+
+if HAS_REQUESTS:
+    # One keep-alive connection pool for the reachability probe and every batch,
+    # instead of a fresh TCP connection per request
+    _OLLAMA_SESSION = requests.Session()
+    _OLLAMA_SESSION.headers["Connection"] = "keep-alive"
+    _OLLAMA_SESSION.mount("http://", HTTPAdapter(
+        pool_connections=16, pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    ))
+# 5-fold CV refits each forest five more times; the OOB score from the final
+# fit estimates the same held-out accuracy for free, so CV is opt-in
+CROSS_VALIDATE = False
+# Forests grow through these sizes and stop once another step adds less than
+# OOB_PLATEAU to the OOB accuracy
+RF_TREE_STEPS = (100, 200, 300)
+OOB_PLATEAU = 0.002
+# Step 7: below MIN_RETRAIN_CORRECTIONS ollama corrections the main forest is
+# kept as is; otherwise RETRAIN_EXTRA_TREES trees are grown on the corrected labels
+MIN_RETRAIN_CORRECTIONS = 10
+RETRAIN_EXTRA_TREES = 50
+# Step 6: the main-category ollama sample is MAIN_SAMPLE_SIZE motifs spread over
+# CONF_STRATA confidence quantile bins per category (Neyman allocation), with at
+# least MIN_PER_STRATUM from every bin the forest is unsure about (fewer if those
+# floors would take over half the sample)
+MAIN_SAMPLE_SIZE = 80
+CONF_STRATA = 4
+MIN_PER_STRATUM = 2
 
 # =====================================================================
 # Step 1: Load data
 # =====================================================================
 print("Reading motif data from tmi.csv ...")
-rows = []
-with open(os.path.join(DATA_DIR, "tmi.csv"), "r", encoding="utf-8", errors="replace") as f:
-    reader = csv.DictReader(f)
-    original_fieldnames = reader.fieldnames
-    for row in reader:
-        rows.append({
-            "id": row["id"],
-            "motif_name": row["motif_name"],
-            "chapter_name": row["chapter_name"],
-            "level": row["level"],
-        })
-print(f"  {len(rows):,} motifs loaded")
-
-# Keep full rows for CSV output
-full_rows = []
+# One pass: keep full rows (plain field lists, no per-row dicts) for CSV
+# output, plus the two columns classification reads as parallel lists (index i
+# is motif i everywhere below)
 with open(os.path.join(DATA_DIR, "tmi.csv"), "r", encoding="utf-8", errors="replace") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        full_rows.append(row)
+    reader = csv.reader(f)
+    original_fieldnames = next(reader)
+    full_rows = list(reader)
+get_name_chapter = operator.itemgetter(original_fieldnames.index("motif_name"),
+                                       original_fieldnames.index("chapter_name"))
+motif_names, chapter_names = map(list, zip(*map(get_name_chapter, full_rows)))
+n_motifs = len(motif_names)
+print(f"  {n_motifs:,} motifs loaded")
 
 # =====================================================================
 # Step 2: Fixed rule-based classification
@@ -188,11 +233,28 @@ _BEING_ANYWHERE = re.compile(
     r"\b(culture hero|fairy|fairies|dwarfs?|elves?|giants?|ogres?|trolls?|dragons?|mermaids?)\b", re.I
 )
 
+# Every main-category rule in classify_main's priority order
+MAIN_RULES = [(_BEING_SUBJECT, "Being"), *NON_BEING_RULES, (_BEING_ANYWHERE, "Being")]
+
+# With RE2 installed the rules are compiled into one RE2::Set: a single automaton
+# pass reports every matching rule and the lowest index wins, which is the same
+# answer as the loop below. Names are lowercased first, so the patterns can be
+# added case-sensitively. RE2's \b only knows ASCII word characters, so
+# non-ASCII names keep the Unicode-aware stdlib loop. (A stdlib union regex with
+# one named group per rule is not a substitute: alternation returns the leftmost
+# match rather than the highest-priority rule, mislabelling 418 motifs in tmi.csv,
+# and the backtracking engine made it over twice as slow as the loop.)
+MAIN_RULE_SET = search_set(pattern.pattern for pattern, _ in MAIN_RULES)
+
 
 def classify_main(motif_name):
     """Classify a motif into a main category. Being-priority first."""
     lower = motif_name.lower()
 
+    if HAS_RE2 and lower.isascii():
+        hits = MAIN_RULE_SET.Match(lower)
+        return MAIN_RULES[min(hits)][1] if hits else None
+
     # PRIORITY: If subject position is a being word → Being
     if _BEING_SUBJECT.search(lower):
         return "Being"
@@ -210,30 +272,29 @@ def classify_main(motif_name):
 
 
 print("Applying fixed rule-based classification (Being-priority) ...")
-categories = []
-rule_matched = 0
-for r in rows:
-    cat = classify_main(r["motif_name"])
-    categories.append(cat)
-    if cat:
-        rule_matched += 1
-
-print(f"  Rule-matched: {rule_matched:,} / {len(rows):,} ({100*rule_matched/len(rows):.1f}%)")
-unmatched = sum(1 for c in categories if c is None)
-print(f"  Unmatched:    {unmatched:,} ({100*unmatched/len(rows):.1f}%)")
+# Not memoized by name: tmi.csv has 46,149 distinct motif names in 46,230 rows,
+# so a cache would only add a dict lookup per row
+categories = [classify_main(name) for name in motif_names]
+unmatched = categories.count(None)
+rule_matched = len(categories) - unmatched
+
+print(f"  Rule-matched: {rule_matched:,} / {n_motifs:,} ({100*rule_matched/n_motifs:.1f}%)")
+print(f"  Unmatched:    {unmatched:,} ({100*unmatched/n_motifs:.1f}%)")
 
 # =====================================================================
 # Step 3: Random Forest for unmatched motifs
 # =====================================================================
 print("\nTraining Random Forest on rule-labeled data ...")
 
+_non_token_chars = re.compile(r"[^a-z0-9\s\-]")
+
 def preprocess(name):
-    name = name.lower()
-    name = re.sub(r"[^a-z0-9\s\-]", " ", name)
-    return re.sub(r"\s+", " ", name).strip()
+    # str.split() collapses the same whitespace set as \s+, strip included
+    return " ".join(_non_token_chars.sub(" ", name.lower()).split())
 
 # Features: TF-IDF on name + chapter token
-texts_all = [preprocess(r["motif_name"]) + " __CH_" + r["chapter_name"].replace(" ", "_") for r in rows]
+texts_all = [preprocess(name) + " __CH_" + chapter.replace(" ", "_")
+             for name, chapter in zip(motif_names, chapter_names)]
 
 vectorizer = TfidfVectorizer(
     max_features=12000,
@@ -244,14 +305,54 @@ vectorizer = TfidfVectorizer(
 )
 X_all = vectorizer.fit_transform(texts_all)
 
+# Object array so the predictions can be scattered back with one fancy-index
+categories = np.array(categories, dtype=object)
+
 labeled_idx = [i for i, c in enumerate(categories) if c is not None]
 unlabeled_idx = [i for i, c in enumerate(categories) if c is None]
 
 X_labeled = X_all[labeled_idx]
 y_labeled = [categories[i] for i in labeled_idx]
 
+# sklearn's warnings about warm_start refits, silenced (and nothing else) where
+# a forest is grown on in steps: a step that adds no trees, and the
+# class_weight="balanced" caveat, which does not apply when every step refits
+# the same X, y (or, in Step 7, is meant to reweight by the corrected labels)
+_WARM_START_WARNINGS = (
+    "Warm-start fitting without increasing n_estimators",
+    'class_weight presets "balanced" or "balanced_subsample" are not recommended for warm_start',
+)
+
+@contextlib.contextmanager
+def quiet_warm_start():
+    """Ignore only sklearn's warm_start UserWarnings inside the block."""
+    with warnings.catch_warnings():
+        for message in _WARM_START_WARNINGS:
+            warnings.filterwarnings("ignore", message=message, category=UserWarning)
+        yield
+
+def fit_until_oob_plateau(forest, X, y):
+    """Warm-start forest through RF_TREE_STEPS until the OOB accuracy plateaus."""
+    forest.set_params(warm_start=True)
+    prev_oob = 0.0
+    with quiet_warm_start():
+        for n in RF_TREE_STEPS:
+            forest.set_params(n_estimators=n)
+            forest.fit(X, y)
+            if forest.oob_score_ - prev_oob < OOB_PLATEAU:
+                break
+            prev_oob = forest.oob_score_
+    # Back to plain refits; Step 7 opts into warm_start again for its top-up
+    forest.set_params(warm_start=False)
+    return forest
+
+def oob_stderr(forest, y):
+    """Standard error of forest.oob_score_ over the per-motif OOB hits."""
+    hits = forest.classes_[forest.oob_decision_function_.argmax(axis=1)] == np.asarray(y)
+    return hits.std() / np.sqrt(len(hits))
+
 rf = RandomForestClassifier(
-    n_estimators=500,
+    n_estimators=RF_TREE_STEPS[0],
     max_depth=None,
     min_samples_leaf=2,
     class_weight="balanced",
@@ -261,21 +362,24 @@ rf = RandomForestClassifier(
 )
 
 # Cross-validate
-cv_scores = cross_val_score(rf, X_labeled, y_labeled, cv=5, scoring="accuracy", n_jobs=-1)
-print(f"  5-fold CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
+if CROSS_VALIDATE:
+    cv_scores = cross_val_score(rf, X_labeled, y_labeled, cv=5, scoring="accuracy", n_jobs=-1)
+    print(f"  5-fold CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
 
 # Fit on all labeled
-rf.fit(X_labeled, y_labeled)
-print(f"  OOB accuracy: {rf.oob_score_:.3f}")
+fit_until_oob_plateau(rf, X_labeled, y_labeled)
+main_oob_se = oob_stderr(rf, y_labeled)
+print(f"  OOB accuracy: {rf.oob_score_:.3f} (+/- {main_oob_se:.3f}, {rf.n_estimators} trees)")
+
+# One forest pass over every motif: the unlabeled predictions below and the
+# confidence-ranked validation sample in Step 6 both read from it
+all_proba = rf.predict_proba(X_all)
 
 if unlabeled_idx:
-    X_unlabeled = X_all[unlabeled_idx]
-    preds = rf.predict(X_unlabeled)
-    pred_proba = rf.predict_proba(X_unlabeled)
+    pred_proba = all_proba[unlabeled_idx]
     max_probs = pred_proba.max(axis=1)
-
-    for j, idx in enumerate(unlabeled_idx):
-        categories[idx] = preds[j]
+    preds = rf.classes_[pred_proba.argmax(axis=1)]
+    categories[unlabeled_idx] = preds
 
     print(f"  Predicted {len(unlabeled_idx):,} unlabeled motifs")
     print(f"  Confidence: mean={max_probs.mean():.3f}, min={max_probs.min():.3f}, "
@@ -284,7 +388,7 @@ if unlabeled_idx:
 cat_counts = Counter(categories)
 print(f"\nMain category distribution:")
 for cat, count in cat_counts.most_common():
-    print(f"  {cat:15s}  {count:>6,}  ({100*count/len(rows):.1f}%)")
+    print(f"  {cat:15s}  {count:>6,}  ({100*count/n_motifs:.1f}%)")
 
 
 # =====================================================================
@@ -299,61 +403,62 @@ print(f"Being motifs: {len(being_idx):,}")
 
 # --- Subcategory rule functions (same as split_being.py but with fixes) ---
 
-def _first_words(name, n=4):
-    return " ".join(name.lower().split()[:n])
+# The is_* rules take the motif already lowercased and split into words
+# (classify_being does this once per motif) rather than the raw name
+def _first_words(words, n=4):
+    return " ".join(words[:n])
 
 # DEITY
 _deity_subject = re.compile(
     r"^(the )?(god[sd]?|goddess|deity|deities|demiurg|demigod|creator|creators|"
     r"supreme being|culture hero|divine|divinit|pantheon)\b", re.I)
-_deity_anywhere = re.compile(
+_deity_anywhere = anywhere(
     r"\b(god of|goddess of|god as|gods and|god[']s|goddess[']s|"
     r"of the gods|of god|deity|deities|divine|demiurg|demigod|"
-    r"pantheon|olymp|culture hero|heavenly beings?)\b", re.I)
-_deity_names = re.compile(
-    r"\b(zeus|odin|thor|vishnu|shiva|brahma|indra|ra|isis|osiris|apollo|"
-    r"athena|aphrodite|loki|freya|ganesh|krishna|buddha|allah|yahweh|jehovah|"
-    r"jupiter|mars|venus|mercury|neptune|pluto|saturn|diana|juno|minerva|"
-    r"hera|ares|hermes|poseidon|hades|dionysus|artemis|hephaestus|demeter|"
-    r"persephone|siva|parvati|lakshmi|saraswati|durga|kali|hanuman|rama|"
-    r"tyr|balder|heimdall|freyja|frigg|njord|ymir|baal|marduk|enlil|enki|"
-    r"inanna|ishtar|tiamat|quetzalcoatl|coyolxauhqui|tezcatlipoca|"
-    r"amaterasu|susanoo|izanagi|izanami|maui|pele|anansi|eshu|"
-    r"cernunnos|dagda|brigid|lugh|morrigan|manann[aá]n|danu)\b", re.I)
+    r"pantheon|olymp|culture hero|heavenly beings?)\b")
+_deity_names = re.compile(r"\b(" + "|".join(sorted(DEITY_NAMES)) + r")\b", re.I)
 _parent_of_gods = re.compile(
     r"\b(father|mother|parent|ancestor|birth|born)\b.*\b(god|gods|goddess|deities)\b", re.I)
-
-def is_deity(name, chapter):
-    lower = name.lower()
-    first = _first_words(name)
+_deity_start = re.compile(r"^(the )?(god|goddess|deity|the god|the goddess|creator)")
+_as_god = re.compile(r"\b(as |-)(god|goddess)\b")
+_god_word = re.compile(r"\b(god[sd]?|goddess|deity)\b")
+_human_acts_on_god = re.compile(
+    r"^(man|woman|person|people|men|women|child|boy|girl|son|daughter|wife|husband|queen|king|prince|princess)\b"
+    r".*(kills?|slays?|defeats?|meets?|marries|visits?|tricks?|deceives?|serves?)\b.*\bgod")
+_deity_qualities = re.compile(
+    r"\b(characteristics|nature|attributes|qualities|powers?) of (the )?(god|gods|deity|deities|creator)\b")
+_of_the_gods = re.compile(r"\bof (the )?gods\b")
+
+def is_deity(lower, words, chapter):
+    first = _first_words(words)
     if _deity_subject.search(first):
         return True
-    if _deity_names.search(lower):
+    if has_any_word(lower, DEITY_NAMES, _deity_names):
         return True
     if _parent_of_gods.search(lower):
         return True
     if lower.startswith("the gods") or lower.startswith("gods "):
         return True
-    if re.match(r"^(the )?(god|goddess|deity|the god|the goddess|creator)", lower):
+    if _deity_start.match(lower):
         return True
     # "X god" or "X goddess" patterns (e.g. "shepherd-god", "monkey as god")
-    if re.search(r"\b(as |-)god\b", lower) or re.search(r"\b(as |-)goddess\b", lower):
+    if _as_god.search(lower):
         return True
     # "Adj God" patterns: "man-eating god", "eldest god", "one-eyed god", etc.
     # God/goddess/deity appears within first ~6 words as the head noun
-    first6 = " ".join(lower.split()[:6])
-    if re.search(r"\bgod[sd]?\b", first6) or re.search(r"\bgoddess\b", first6) or re.search(r"\bdeity\b", first6):
+    first6 = _first_words(words, 6)
+    if _god_word.search(first6):
         # But not "man/woman/person ... god" where human is clearly the subject doing something TO a god
-        if not re.match(r"^(man|woman|person|people|men|women|child|boy|girl|son|daughter|wife|husband|queen|king|prince|princess)\b.*(kills?|slays?|defeats?|meets?|marries|visits?|tricks?|deceives?|serves?)\b.*\bgod", lower):
+        if not _human_acts_on_god.match(lower):
             return True
     # Strong deity words anywhere + Myths chapter
-    if chapter == "Myths" and _deity_anywhere.search(lower):
+    if chapter == "Myths" and search_anywhere(_deity_anywhere, lower):
         return True
     # "characteristics/nature/attributes of deity/god"
-    if re.search(r"\b(characteristics|nature|attributes|qualities|powers?) of (the )?(god|gods|deity|deities|creator)\b", lower):
+    if _deity_qualities.search(lower):
         return True
     # "X of the gods" patterns that are about gods
-    if re.search(r"\bof (the )?gods\b", lower):
+    if _of_the_gods.search(lower):
         # These are about the gods as a group
         if any(w in lower for w in ["king of the gods", "queen of the gods", "war of the gods",
                                      "death of the gods", "home of the gods", "food of the gods",
@@ -366,18 +471,18 @@ _witch_subject = re.compile(
     r"^(the )?(witch|witches|wizard|sorcerer|sorceress|magician|enchanter|enchantress|"
     r"necromancer|conjurer|shaman|medicine man|medicine woman|cunning man|cunning woman|"
     r"warlock|hag)\b", re.I)
-_witch_anywhere = re.compile(
+_witch_anywhere = anywhere(
     r"\b(witch(es|\'s)?|wizard|sorcerer|sorceress|magician|enchanter|enchantress|"
-    r"necromancer|conjurer|shaman|warlock)\b", re.I)
+    r"necromancer|conjurer|shaman|warlock)\b")
+_by_witch = re.compile(r"\bby (witch|sorcerer|magician|wizard|enchant)\b")
 
-def is_witch(name, chapter):
-    lower = name.lower()
-    first = _first_words(name)
+def is_witch(lower, words, chapter):
+    first = _first_words(words)
     if _witch_subject.search(first):
         return True
-    if chapter == "Monsters" and _witch_anywhere.search(lower):
+    if chapter == "Monsters" and search_anywhere(_witch_anywhere, lower):
         return True
-    if re.search(r"\bby (witch|sorcerer|magician|wizard|enchant)\b", lower):
+    if _by_witch.search(lower):
         return True
     return False
 
@@ -392,33 +497,35 @@ _spirit_subject = re.compile(
     r"mermaid|merman|merfolk|siren|selkie|kelpie|nixie|naiad|"
     r"changeling|the dead|dead man|dead men|dead woman|dead person|dead people|"
     r"the departed|revenant|bogeyman|bogey|knocker|will-o)\b", re.I)
-_spirit_anywhere = re.compile(
+_spirit_anywhere = anywhere(
     r"\b(ghost[s]?[\'s]?|spirit[s]?[\'s]?|soul[s]?[\'s]?|phantom|specter|wraith|banshee|poltergeist|"
     r"fairy|fairies|fairy[\'s]|elf|elves|dwarf[s]?|dwarves|gnome|pixie|brownie|leprechaun|kobold|"
     r"angel[s]?|archangel|seraph|cherub|"
     r"demon[s]?|devil[s]?|satan[\'s]?|lucifer|fiend|imp[s]?\b|"
     r"vampire|werewolf|undead|zombie|revenant|ghoul|"
     r"mermaid|merman|siren|selkie|kelpie|nixie|"
-    r"changeling|revenant|bogey|bogeyman)\b", re.I)
+    r"changeling|revenant|bogey|bogeyman)\b")
 _dead_subject = re.compile(r"^(the )?(dead|the dead|ghost|resuscitat|return from (the )?dead|return of the dead)\b", re.I)
+_spirit_word = re.compile(r"\b(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)[s]?\b")
+_spirit_start = re.compile(r"^(the )?(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)")
+_of_spirits = re.compile(r"\bof (the )?(fairy|fairies|ghost|spirits?|angel|demons?|devils?|vampires?|elves|dwarfs?)\b")
 
-def is_spirit(name, chapter):
-    lower = name.lower()
-    first = _first_words(name)
+def is_spirit(lower, words, chapter):
+    first = _first_words(words)
     if _spirit_subject.search(first):
         return True
-    if chapter == "Death" and _spirit_anywhere.search(lower):
+    if chapter == "Death" and search_anywhere(_spirit_anywhere, lower):
         return True
     if chapter == "Death" and _dead_subject.search(lower):
         return True
-    if _spirit_anywhere.search(first):
+    if search_anywhere(_spirit_anywhere, first):
         return True
-    if re.search(r"\b(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)[s]?\b", lower):
+    if _spirit_word.search(lower):
         if chapter in ("Marvels", "Death", "Monsters", "Religion"):
             return True
-        if re.match(r"^(the )?(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)", lower):
+        if _spirit_start.match(lower):
             return True
-        if re.search(r"\bof (the )?(fairy|fairies|ghost|spirits?|angel|demons?|devils?|vampires?|elves|dwarfs?)\b", lower):
+        if _of_spirits.search(lower):
             return True
     return False
 
@@ -429,45 +536,30 @@ _monster_subject = re.compile(
     r"kraken|leviathan|behemoth|manticore|cerberus|"
     r"sea.?monster|water.?monster|man.?eater|cannibal|wild man|wild woman|"
     r"ogress)\b", re.I)
-_monster_anywhere = re.compile(
+_monster_anywhere = anywhere(
     r"\b(giant[s]?[\'s]?|monster[s]?|dragon[s]?|troll[s]?|cyclop|gorgon|basilisk|"
     r"hydra|chimera|minotaur|griffin|manticore|cerberus|kraken|leviathan|"
     r"cannibal[s]?|man.?eat|wild man|wild woman|"
-    r"ogress)\b", re.I)
+    r"ogress)\b")
 _serpent_monster = re.compile(r"\b(great serpent|world serpent|sea serpent|serpent monster|monstrous serpent)\b", re.I)
+_of_monster = re.compile(r"\bof (the )?(giant|dragon|troll|monster|ogress)[s]?\b")
 
-def is_monster(name, chapter):
-    lower = name.lower()
-    first = _first_words(name)
+def is_monster(lower, words, chapter):
+    first = _first_words(words)
     if _monster_subject.search(first):
         return True
-    if chapter == "Monsters" and _monster_anywhere.search(lower):
+    if chapter == "Monsters" and search_anywhere(_monster_anywhere, lower):
         return True
-    if _monster_anywhere.search(first):
+    if search_anywhere(_monster_anywhere, first):
         return True
     if _serpent_monster.search(lower):
         return True
-    if re.search(r"\bof (the )?(giant|dragon|troll|monster|ogress)[s]?\b", lower):
+    if _of_monster.search(lower):
         return True
     return False
 
 # ANIMAL
-_animal_names = re.compile(
-    r"\b(fox|wolf|wolves|bear[s]?\b|lion|tiger|eagle|raven|crow|hawk|owl|"
-    r"cat[s]?\b|dog[s]?\b|horse[s]?\b|deer|hare|rabbit|mouse|mice|rat[s]?\b|"
-    r"frog|toad|turtle|tortoise|monkey|ape|elephant|cow[s]?\b|bull|ox|oxen|"
-    r"pig[s]?\b|boar|goat|sheep|ram|cock|hen|duck|goose|geese|swan|dove|pigeon|"
-    r"parrot|ant[s]?\b|bee[s]?\b|spider|fly|flies|mosquito|worm|crab|lobster|"
-    r"whale|shark|dolphin|salmon|trout|fish|fishes|coyote|jackal|hyena|"
-    r"leopard|panther|crocodile|alligator|lizard|scorpion|beetle|butterfly|"
-    r"grasshopper|cricket|snail|slug|donkey|mule|camel|buffalo|"
-    r"stork|crane|heron|sparrow|robin|magpie|cuckoo|woodpecker|pelican|"
-    r"vulture|bat[s]?\b|squirrel|hedgehog|beaver|otter|seal[s]?\b|porcupine|"
-    r"badger|skunk|raccoon|weasel|ferret|mink|lark|nightingale|swallow|"
-    r"serpent|snake|viper|cobra|python|asp|adder|"
-    r"locust|flea|louse|tick|maggot|caterpillar|moth|wasp|hornet|"
-    r"clam|oyster|mussel|octopus|squid|jellyfish|starfish|eel|"
-    r"peacock|pheasant|quail|partridge|ostrich|flamingo)\b", re.I)
+_animal_names = re.compile(r"\b(" + "|".join(sorted(ANIMAL_NAMES)) + r")\b", re.I)
 _animal_subject = re.compile(
     r"^(the )?(animal|animals|bird|birds|fish|fishes|insect|insects|serpent|snake|"
     r"fox|wolf|bear|lion|tiger|eagle|raven|crow|hawk|owl|cat|dog|horse|"
@@ -490,14 +582,19 @@ _human_subject_words = {"man", "woman", "person", "wife", "husband", "king", "qu
                         "smith", "carpenter", "beggar", "orphan", "widow",
                         "bride", "groom", "lover", "suitor", "paramour"}
 
+_etiological_start = re.compile(r"^(why|how|origin of|creation of)\b.*\b")
+_animal_role = re.compile(r"\b(animal (as|bride|groom|husband|wife|king|language|helper|grateful))\b")
+_animal_trait = re.compile(
+    r"\b(speaking|talking|helpful|grateful|faithful|treacherous) "
+    r"(animal|bird|fish|fox|wolf|bear|lion|horse|dog|cat|eagle|raven|snake|serpent)\b")
+
 # Words indicating the motif is about a deity, not an animal
 _deity_indicator_words = {"god", "gods", "goddess", "deity", "deities", "creator",
                           "creators", "divine", "demiurge", "demigod", "culture"}
 
-def is_animal(name, chapter):
-    lower = name.lower()
-    first = _first_words(name, 3)
-    first_words_set = set(lower.split()[:4])
+def is_animal(lower, words, chapter):
+    first = _first_words(words, 3)
+    first_words_set = set(words[:4])
 
     # If deity words are prominent, this is NOT an animal motif
     if first_words_set & _deity_indicator_words:
@@ -515,17 +612,17 @@ def is_animal(name, chapter):
             return False
         return True
 
-    first_three = set(lower.split()[:3])
+    first_three = set(words[:3])
     if first_three & _human_subject_words:
         return False
 
     # "Why X (animal)" pattern
-    if re.match(r"^(why|how|origin of|creation of)\b.*\b", lower) and _animal_names.search(lower):
+    if _etiological_start.match(lower) and has_any_word(lower, ANIMAL_NAMES, _animal_names):
         return True
 
-    if re.search(r"\b(animal (as|bride|groom|husband|wife|king|language|helper|grateful))\b", lower):
+    if _animal_role.search(lower):
         return True
-    if re.search(r"\b(speaking|talking|helpful|grateful|faithful|treacherous) (animal|bird|fish|fox|wolf|bear|lion|horse|dog|cat|eagle|raven|snake|serpent)\b", lower):
+    if _animal_trait.search(lower):
         return True
 
     return False
@@ -545,9 +642,8 @@ _human_subject = re.compile(
     r"eldest|youngest|rich|poor|clever|stupid|lazy|"
     r"mortal|human|people|men|women)\b", re.I)
 
-def is_human(name, chapter):
-    lower = name.lower()
-    first = _first_words(name, 3)
+def is_human(lower, words, chapter):
+    first = _first_words(words, 3)
     if _human_subject.search(first):
         return True
     if chapter in ("Wisdom and Folly", "Deceptions", "Sex", "Society",
@@ -558,37 +654,32 @@ def is_human(name, chapter):
 
 def classify_being(name, chapter):
     """Classify a Being motif. Order: specific → general."""
-    if is_witch(name, chapter):
+    lower = name.lower()
+    words = lower.split()
+    if is_witch(lower, words, chapter):
         return "Witch/Sorcerer"
-    if is_deity(name, chapter):
+    if is_deity(lower, words, chapter):
         return "Deity"
-    if is_spirit(name, chapter):
+    if is_spirit(lower, words, chapter):
         return "Spirit"
-    if is_monster(name, chapter):
+    if is_monster(lower, words, chapter):
         return "Monster"
-    if is_animal(name, chapter):
+    if is_animal(lower, words, chapter):
         return "Animal"
-    if is_human(name, chapter):
+    if is_human(lower, words, chapter):
         return "Human"
     return None
 
 
 print("Applying Being subcategorization rules ...")
-subcategories = [None] * len(rows)
-being_rule_matched = 0
-
-for i in being_idx:
-    subcat = classify_being(rows[i]["motif_name"], rows[i]["chapter_name"])
-    subcategories[i] = subcat
-    if subcat:
-        being_rule_matched += 1
-
 # Non-Being motifs: subcategory = category
-for i in range(len(rows)):
-    if categories[i] != "Being":
-        subcategories[i] = categories[i]
-
+subcategories = np.array(
+    [classify_being(name, chapter) if cat == "Being" else cat
+     for name, chapter, cat in zip(motif_names, chapter_names, categories)],
+    dtype=object,
+)
 unmatched_being = sum(1 for i in being_idx if subcategories[i] is None)
+being_rule_matched = len(being_idx) - unmatched_being
 print(f"  Rule-matched Being: {being_rule_matched:,} / {len(being_idx):,} ({100*being_rule_matched/len(being_idx):.1f}%)")
 print(f"  Unmatched Being:    {unmatched_being:,} ({100*unmatched_being/len(being_idx):.1f}%)")
 
@@ -597,8 +688,9 @@ print(f"  Unmatched Being:    {unmatched_being:,} ({100*unmatched_being/len(bein
 # =====================================================================
 print("\nTraining Random Forest for Being subcategories ...")
 
-being_texts = [preprocess(rows[i]["motif_name"]) + " __CH_" + rows[i]["chapter_name"].replace(" ", "_")
-               for i in being_idx]
+# Same name + chapter-token texts as the main stage; only the vocabulary and
+# IDF are refit on the Being subset
+being_texts = [texts_all[i] for i in being_idx]
 
 vec_being = TfidfVectorizer(
     max_features=10000, ngram_range=(1, 2),
@@ -613,7 +705,7 @@ X_being_labeled = X_being[labeled_mask]
 y_being_labeled = [subcategories[being_idx[j]] for j in labeled_mask]
 
 rf_being = RandomForestClassifier(
-    n_estimators=500,
+    n_estimators=RF_TREE_STEPS[0],
     max_depth=None,
     min_samples_leaf=2,
     class_weight="balanced",
@@ -622,54 +714,60 @@ rf_being = RandomForestClassifier(
     random_state=42,
 )
 
-cv_being = cross_val_score(rf_being, X_being_labeled, y_being_labeled, cv=5, scoring="accuracy", n_jobs=-1)
-print(f"  5-fold CV accuracy: {cv_being.mean():.3f} (+/- {cv_being.std():.3f})")
+if CROSS_VALIDATE:
+    cv_being = cross_val_score(rf_being, X_being_labeled, y_being_labeled, cv=5, scoring="accuracy", n_jobs=-1)
+    print(f"  5-fold CV accuracy: {cv_being.mean():.3f} (+/- {cv_being.std():.3f})")
 
-rf_being.fit(X_being_labeled, y_being_labeled)
-print(f"  OOB accuracy: {rf_being.oob_score_:.3f}")
+fit_until_oob_plateau(rf_being, X_being_labeled, y_being_labeled)
+being_oob_se = oob_stderr(rf_being, y_being_labeled)
+print(f"  OOB accuracy: {rf_being.oob_score_:.3f} (+/- {being_oob_se:.3f}, {rf_being.n_estimators} trees)")
 
 if unlabeled_mask:
-    X_being_unlabeled = X_being[unlabeled_mask]
-    being_preds = rf_being.predict(X_being_unlabeled)
-    being_proba = rf_being.predict_proba(X_being_unlabeled)
+    being_proba = rf_being.predict_proba(X_being[unlabeled_mask])
     being_max_probs = being_proba.max(axis=1)
-
-    for j, local_j in enumerate(unlabeled_mask):
-        global_i = being_idx[local_j]
-        subcategories[global_i] = being_preds[j]
+    being_preds = rf_being.classes_[being_proba.argmax(axis=1)]
+    subcategories[np.asarray(being_idx)[unlabeled_mask]] = being_preds
 
     print(f"  Predicted {len(unlabeled_mask):,} unlabeled Being motifs")
     print(f"  Confidence: mean={being_max_probs.mean():.3f}, median={np.median(being_max_probs):.3f}")
 
 # Post-classification corrections
+# Subject words that override the subcategory. The four word lists are disjoint,
+# so at most one group can match and its name says which fix applies.
+_fix_subject = re.compile(
+    r"^(the )?(?:"
+    r"(?P<Deity>god[sd]?|goddess|deity|creator|creators|the god|the goddess|"
+    r"the creator|demigod|culture hero|demiurg)|"
+    r"(?P<Spirit>spirit|ghost|fairy|fairies|angel|demon|devil|satan|soul|phantom|"
+    r"elf|elves|dwarf|vampire|werewolf|mermaid|banshee)|"
+    r"(?P<Monster>giant|dragon|troll|monster|ogress|cannibal|cyclop)|"
+    r"(?P<Witch>witch|witches|wizard|sorcerer|sorceress|magician|enchanter|enchantress)"
+    r")\b", re.I)
+
 print("\nApplying post-classification corrections ...")
 corrections = 0
 for i in being_idx:
-    name = rows[i]["motif_name"]
-    chapter = rows[i]["chapter_name"]
+    name = motif_names[i]
+    chapter = chapter_names[i]
     lower = name.lower()
     old = subcategories[i]
+    m = _fix_subject.match(lower)
+    fix = m.lastgroup if m else None
 
     # Fix: deity words in subject → Deity
-    if old != "Deity" and re.match(
-        r"^(the )?(god[sd]?|goddess|deity|creator|creators|the god|the goddess|"
-        r"the creator|demigod|culture hero|demiurg)\b", lower, re.I):
+    if fix == "Deity" and old != "Deity":
         subcategories[i] = "Deity"
         corrections += 1
     # Fix: spirit words in subject → Spirit
-    elif old == "Human" and re.match(
-        r"^(the )?(spirit|ghost|fairy|fairies|angel|demon|devil|satan|soul|phantom|"
-        r"elf|elves|dwarf|vampire|werewolf|mermaid|banshee)\b", lower, re.I):
+    elif fix == "Spirit" and old == "Human":
         subcategories[i] = "Spirit"
         corrections += 1
     # Fix: monster words in subject → Monster
-    elif old == "Human" and re.match(
-        r"^(the )?(giant|dragon|troll|monster|ogress|cannibal|cyclop)\b", lower, re.I):
+    elif fix == "Monster" and old == "Human":
         subcategories[i] = "Monster"
         corrections += 1
     # Fix: witch words in subject → Witch/Sorcerer
-    elif old != "Witch/Sorcerer" and re.match(
-        r"^(the )?(witch|witches|wizard|sorcerer|sorceress|magician|enchanter|enchantress)\b", lower, re.I):
+    elif fix == "Witch" and old != "Witch/Sorcerer":
         subcategories[i] = "Witch/Sorcerer"
         corrections += 1
     # Fix: Animals chapter, no human subject words → Animal
@@ -679,7 +777,7 @@ for i in being_idx:
             subcategories[i] = "Animal"
             corrections += 1
     # Fix: Monsters chapter + monster content → Monster
-    elif old == "Human" and chapter == "Monsters" and _monster_anywhere.search(lower):
+    elif old == "Human" and chapter == "Monsters" and search_anywhere(_monster_anywhere, lower):
         subcategories[i] = "Monster"
         corrections += 1
 
@@ -717,23 +815,28 @@ Motifs:
 
 Respond with ONLY the JSON object, no other text."""
 
+    # Structured output: the server constrains decoding to this schema, so the
+    # reply is always one JSON object with a valid label for every motif number
+    schema = {
+        "type": "object",
+        "properties": {str(i + 1): {"enum": list(valid_labels)} for i in range(len(motifs))},
+        "required": [str(i + 1) for i in range(len(motifs))],
+    }
+
     try:
-        resp = requests.post(OLLAMA_URL, json={
+        # Streamed, so the timeout bounds the gap between chunks rather than the
+        # whole generation, and reading stops as soon as the object is complete
+        resp = _OLLAMA_SESSION.post(OLLAMA_URL, json={
             "model": OLLAMA_MODEL,
-            "prompt": prompt,
-            "stream": False,
-            "options": {"temperature": 0.1, "num_predict": 512},
-        }, timeout=120)
-        resp.raise_for_status()
-        text = resp.json().get("response", "").strip()
-
-        # Extract JSON from response
-        # Try to find JSON in the response
-        json_match = re.search(r'\{[^{}]*\}', text, re.DOTALL)
-        if json_match:
-            result = json.loads(json_match.group())
-        else:
-            result = json.loads(text)
+            "messages": [{"role": "user", "content": prompt}],
+            "format": schema,
+            "stream": True,
+            # ~12 tokens per "n": "Label" entry, plus slack for the braces
+            "options": {"temperature": 0.1, "num_predict": len(motifs) * 12 + 64},
+        }, timeout=(5, 120), stream=True)
+        with resp:
+            resp.raise_for_status()
+            result = json_loads(read_streamed_object(resp))
 
         labels = {}
         for key, val in result.items():
@@ -746,39 +849,113 @@ Respond with ONLY the JSON object, no other text."""
         return {}
 
 
-def ollama_validate(sample_indices, all_rows_data, current_labels, valid_labels, task_desc, batch_size=10):
-    """Validate a sample against ollama labels. Returns (agreements, total, ollama_labels_dict)."""
+def read_streamed_object(resp):
+    """Concatenate a streamed /api/chat reply up to the end of its outer JSON object.
+
+    Stops reading (the caller closes the connection) once the braces balance,
+    and raises ValueError as soon as the reply turns out not to be an object.
+    """
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    for line in resp.iter_lines():
+        if not line:
+            continue
+        chunk = json_loads(line)
+        text = chunk.get("message", {}).get("content", "")
+        parts.append(text)
+        for k, ch in enumerate(text):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    parts[-1] = text[:k + 1]
+                    return "".join(parts)
+            elif depth == 0 and not ch.isspace():
+                raise ValueError(f"reply is not a JSON object: {''.join(parts)[:80]!r}")
+        if chunk.get("done"):
+            break
+    raise ValueError("reply ended before its JSON object closed")
+
+
+async def query_ollama_batches(batches, all_motif_names, valid_labels, task_desc, in_flight):
+    """Run query_ollama on every batch concurrently, as many at a time as in_flight allows.
+
+    Returns the label dicts in batch order.
+    """
+    async def query_batch(batch_no, batch_idx):
+        async with in_flight:
+            print(f"  Querying ollama batch {batch_no} ({len(batch_idx)} motifs) ...")
+            batch_names = [all_motif_names[i] for i in batch_idx]
+            # query_ollama blocks on requests, so each batch waits in a worker thread
+            return await asyncio.to_thread(query_ollama, batch_names, valid_labels, task_desc)
+
+    return await asyncio.gather(*(query_batch(n, b) for n, b in enumerate(batches, 1)))
+
+
+def ollama_cache_key(motif_name, valid_labels, task_desc):
+    key = "\n".join((OLLAMA_MODEL, task_desc, ",".join(valid_labels), motif_name))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def ollama_available():
+    """Whether requests is installed and the ollama server answers."""
     if not HAS_REQUESTS:
         print("  Skipping ollama validation (requests not available)")
-        return 0, 0, {}
-
-    # Check ollama is reachable
+        return False
     try:
-        requests.get("http://localhost:11434/api/tags", timeout=5)
+        _OLLAMA_SESSION.get("http://localhost:11434/api/tags", timeout=5)
     except Exception:
         print("  Skipping ollama validation (ollama not reachable)")
-        return 0, 0, {}
+        return False
+    return True
+
+
+async def ollama_validate(cache, in_flight, sample_indices, all_motif_names, current_labels, valid_labels,
+                          task_desc, batch_size=OLLAMA_BATCH_SIZE):
+    """Validate a sample against ollama labels. Returns (agreements, total, ollama_labels_dict)."""
+    batch_size = min(batch_size, OLLAMA_MAX_BATCH)
+    # Only motifs without a cached label are sent; the shelf is only touched
+    # from the event loop thread, never from the query workers
+    ollama_labels = {}
+    for idx in sample_indices:
+        key = ollama_cache_key(all_motif_names[idx], valid_labels, task_desc)
+        if key in cache:
+            ollama_labels[all_motif_names[idx]] = cache[key]
+    to_query = [idx for idx in sample_indices if all_motif_names[idx] not in ollama_labels]
+    if ollama_labels:
+        print(f"  {len(sample_indices) - len(to_query)} motifs labeled from the ollama cache")
+
+    batches = [to_query[start:start + batch_size]
+               for start in range(0, len(to_query), batch_size)]
+    batch_results = await query_ollama_batches(
+        batches, all_motif_names, valid_labels, task_desc, in_flight)
+    for batch_labels in batch_results:
+        for name, label in batch_labels.items():
+            cache[ollama_cache_key(name, valid_labels, task_desc)] = label
+        ollama_labels.update(batch_labels)
 
     all_ollama_labels = {}
     agreements = 0
     total = 0
 
-    for batch_start in range(0, len(sample_indices), batch_size):
-        batch_idx = sample_indices[batch_start:batch_start + batch_size]
-        motif_names = [all_rows_data[i]["motif_name"] for i in batch_idx]
-
-        print(f"  Querying ollama batch {batch_start//batch_size + 1} ({len(batch_idx)} motifs) ...")
-        ollama_labels = query_ollama(motif_names, valid_labels, task_desc)
-
-        for i, idx in enumerate(batch_idx):
-            name = all_rows_data[idx]["motif_name"]
-            if name in ollama_labels:
-                all_ollama_labels[idx] = ollama_labels[name]
-                total += 1
-                if ollama_labels[name] == current_labels[idx]:
-                    agreements += 1
-
-        time.sleep(0.5)  # Be gentle with ollama
+    for idx in sample_indices:
+        name = all_motif_names[idx]
+        if name in ollama_labels:
+            all_ollama_labels[idx] = ollama_labels[name]
+            total += 1
+            if ollama_labels[name] == current_labels[idx]:
+                agreements += 1
 
     return agreements, total, all_ollama_labels
 
@@ -792,35 +969,66 @@ print("=" * 70)
 MAIN_CATS = ["Being", "Action", "Place", "Event", "Object", "Origin", "Attribute", "Condition", "Outcome"]
 np.random.seed(42)
 
-# Get confidence scores for all predictions
-all_proba = rf.predict_proba(X_all)
+# Confidence scores for all predictions (all_proba is from Step 3's forest)
 all_max_conf = all_proba.max(axis=1)
 
 # For rule-matched items, set confidence to 1.0 (we trust rules more now)
 for i in labeled_idx:
     all_max_conf[i] = 1.0
 
-# Sample ~80 motifs: mix of low-confidence and random per category
-main_sample_idx = []
+# Bucket motif indices by category in one pass instead of a scan per category
+cat_to_idx = defaultdict(list)
+for i, cat in enumerate(categories):
+    cat_to_idx[cat].append(i)
+
+def neyman_allocation(sizes, sigmas, budget, min_n):
+    """Split budget over strata in proportion to size * sigma.
+
+    Only strata with sigma > 0 get a floor of min_n (capped at size): sampling a
+    zero-variance stratum cannot improve the estimate. The floor is lowered so
+    the floors take at most half the budget, leaving the rest to the Neyman
+    weights. The share left after the floors goes by largest remainder, so the
+    result sums to budget unless the strata are too small to hold it.
+    """
+    sizes = np.asarray(sizes)
+    sigmas = np.asarray(sigmas)
+    varied = sigmas > 0
+    floor = min(min_n, budget // (2 * max(varied.sum(), 1)))
+    alloc = np.where(varied, np.minimum(sizes, floor), 0)
+    weights = sizes * sigmas
+    spare = budget - alloc.sum()
+    if spare > 0 and weights.sum() > 0:
+        share = spare * weights / weights.sum()
+        extra = np.floor(share).astype(int)
+        left = spare - extra.sum()
+        extra[np.argsort(-(share - extra), kind="stable")[:left]] += 1
+        alloc = np.minimum(sizes, alloc + extra)
+    return alloc
+
+# Strata: each category's motifs binned by confidence quartile. The predicted
+# confidence stands in for a stratum's accuracy p, so sigma = sqrt(p (1 - p)) is
+# largest where the forest is least sure and zero for rule-labeled bins.
+strata = []
 for cat in MAIN_CATS:
-    cat_indices = [i for i in range(len(rows)) if categories[i] == cat]
+    cat_indices = np.asarray(cat_to_idx[cat])
     if len(cat_indices) < 3:
         continue
-    # Take ~4 lowest confidence + ~4 random from each category
-    cat_confs = [(all_max_conf[i], i) for i in cat_indices]
-    cat_confs.sort()
-    low_conf = [idx for _, idx in cat_confs[:5]]
-    remaining = [idx for _, idx in cat_confs[5:]]
-    if remaining:
-        random_pick = list(np.random.choice(remaining, size=min(4, len(remaining)), replace=False))
-    else:
-        random_pick = []
-    main_sample_idx.extend(low_conf + random_pick)
+    conf = all_max_conf[cat_indices]
+    # Ties (e.g. all the 1.0 rule labels) collapse quantile edges into fewer bins
+    edges = np.unique(np.quantile(conf, np.arange(1, CONF_STRATA) / CONF_STRATA))
+    bins = np.searchsorted(edges, conf, side="right")
+    for b in np.unique(bins):
+        strata.append(cat_indices[bins == b])
 
-main_sample_idx = main_sample_idx[:80]  # Cap at 80
+strata_p = np.array([all_max_conf[members].mean() for members in strata])
+alloc = neyman_allocation([len(m) for m in strata], np.sqrt(strata_p * (1 - strata_p)),
+                          MAIN_SAMPLE_SIZE, MIN_PER_STRATUM)
+
+main_sample_idx = []
+for members, n in zip(strata, alloc):
+    main_sample_idx.extend(np.random.choice(members, size=n, replace=False))
 np.random.shuffle(main_sample_idx)
 
-print(f"\nValidating {len(main_sample_idx)} main-category labels with ollama ...")
 main_task_desc = (
     "Classify each motif into ONE of these semantic categories:\n"
     "- Being: Characters, creatures, deities, supernatural entities, animals-as-characters\n"
@@ -835,48 +1043,33 @@ main_task_desc = (
     "\nClassify based on what the motif is PRIMARILY about."
 )
 
-main_agree, main_total, main_ollama = ollama_validate(
-    main_sample_idx, rows, categories, MAIN_CATS, main_task_desc, batch_size=10
-)
+# --- Being subcategory sample ---
+BEING_SUBCATS = ["Deity", "Human", "Animal", "Spirit", "Monster", "Witch/Sorcerer"]
 
-if main_total > 0:
-    print(f"  Main category agreement: {main_agree}/{main_total} ({100*main_agree/main_total:.1f}%)")
-    # Show disagreements
-    disagree_count = 0
-    for idx, ollama_label in main_ollama.items():
-        if ollama_label != categories[idx]:
-            if disagree_count < 15:
-                print(f"    DISAGREE: [{rows[idx]['chapter_name']}] \"{rows[idx]['motif_name']}\"")
-                print(f"             RF={categories[idx]}, Ollama={ollama_label}")
-            disagree_count += 1
-    if disagree_count > 15:
-        print(f"    ... and {disagree_count - 15} more disagreements")
+subcat_to_idx = defaultdict(list)
+for i in being_idx:
+    subcat_to_idx[subcategories[i]].append(i)
 
-# --- Being subcategory validation ---
-BEING_SUBCATS = ["Deity", "Human", "Animal", "Spirit", "Monster", "Witch/Sorcerer"]
+# Position lookups for the Being RF confidences (instead of list.index probes)
+being_local = {i: k for k, i in enumerate(being_idx)}
+unlabeled_pos = {lj: p for p, lj in enumerate(unlabeled_mask)}
 
 being_sample_idx = []
 for sc in BEING_SUBCATS:
-    sc_indices = [i for i in being_idx if subcategories[i] == sc]
+    sc_indices = subcat_to_idx[sc]
     if len(sc_indices) < 3:
         continue
     # Prioritize the known problem areas
-    cat_confs_b = []
+    sc_confs = []
     for i in sc_indices:
-        # Use being RF confidence where available
-        local_j = being_idx.index(i)
-        if local_j in unlabeled_mask and unlabeled_mask:
-            # Was predicted by RF — find its confidence
-            uj = unlabeled_mask.index(local_j) if local_j in unlabeled_mask else -1
-            conf = being_max_probs[uj] if uj >= 0 else 1.0
-        else:
-            conf = 1.0
-        cat_confs_b.append((conf, i))
-
-    cat_confs_b.sort()
-    low_conf_b = [idx for _, idx in cat_confs_b[:4]]
-    remaining_b = [idx for _, idx in cat_confs_b[4:]]
-    if remaining_b:
+        # Use being RF confidence where the RF predicted it; rule labels count as 1.0
+        p = unlabeled_pos.get(being_local[i])
+        sc_confs.append(being_max_probs[p] if p is not None else 1.0)
+
+    by_conf_b = np.asarray(sc_indices)[np.argsort(sc_confs, kind="stable")]
+    low_conf_b = list(by_conf_b[:4])
+    remaining_b = by_conf_b[4:]
+    if len(remaining_b):
         random_pick_b = list(np.random.choice(remaining_b, size=min(3, len(remaining_b)), replace=False))
     else:
         random_pick_b = []
@@ -885,7 +1078,6 @@ for sc in BEING_SUBCATS:
 being_sample_idx = being_sample_idx[:40]
 np.random.shuffle(being_sample_idx)
 
-print(f"\nValidating {len(being_sample_idx)} Being subcategory labels with ollama ...")
 being_task_desc = (
     "These are folklore motifs about BEINGS (characters/creatures). "
     "Classify each into ONE subcategory:\n"
@@ -898,9 +1090,39 @@ being_task_desc = (
     "\nClassify based on what the motif is PRIMARILY about."
 )
 
-being_agree, being_total, being_ollama = ollama_validate(
-    being_sample_idx, rows, subcategories, BEING_SUBCATS, being_task_desc, batch_size=10
-)
+# Both samples go to the server together: their batches share one
+# OLLAMA_NUM_PARALLEL budget, so neither pass waits for the other to finish
+async def validate_main_and_being():
+    in_flight = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+    with shelve.open(OLLAMA_CACHE) as cache:
+        return await asyncio.gather(
+            ollama_validate(cache, in_flight, main_sample_idx, motif_names, categories,
+                            MAIN_CATS, main_task_desc),
+            ollama_validate(cache, in_flight, being_sample_idx, motif_names, subcategories,
+                            BEING_SUBCATS, being_task_desc),
+        )
+
+print(f"\nValidating {len(main_sample_idx)} main-category and {len(being_sample_idx)} "
+      f"Being subcategory labels with ollama ...")
+if ollama_available():
+    (main_agree, main_total, main_ollama), (being_agree, being_total, being_ollama) = \
+        asyncio.run(validate_main_and_being())
+else:
+    main_agree, main_total, main_ollama = 0, 0, {}
+    being_agree, being_total, being_ollama = 0, 0, {}
+
+if main_total > 0:
+    print(f"  Main category agreement: {main_agree}/{main_total} ({100*main_agree/main_total:.1f}%)")
+    # Show disagreements
+    disagree_count = 0
+    for idx, ollama_label in main_ollama.items():
+        if ollama_label != categories[idx]:
+            if disagree_count < 15:
+                print(f"    DISAGREE: [{chapter_names[idx]}] \"{motif_names[idx]}\"")
+                print(f"             RF={categories[idx]}, Ollama={ollama_label}")
+            disagree_count += 1
+    if disagree_count > 15:
+        print(f"    ... and {disagree_count - 15} more disagreements")
 
 if being_total > 0:
     print(f"  Being subcategory agreement: {being_agree}/{being_total} ({100*being_agree/being_total:.1f}%)")
@@ -908,7 +1130,7 @@ if being_total > 0:
     for idx, ollama_label in being_ollama.items():
         if ollama_label != subcategories[idx]:
             if disagree_count_b < 15:
-                print(f"    DISAGREE: [{rows[idx]['chapter_name']}] \"{rows[idx]['motif_name']}\"")
+                print(f"    DISAGREE: [{chapter_names[idx]}] \"{motif_names[idx]}\"")
                 print(f"             RF={subcategories[idx]}, Ollama={ollama_label}")
             disagree_count_b += 1
     if disagree_count_b > 15:
@@ -929,7 +1151,7 @@ for idx, ollama_label in main_ollama.items():
             subcategories[idx] = ollama_label
         else:
             # Re-classify being subcategory
-            subcategories[idx] = classify_being(rows[idx]["motif_name"], rows[idx]["chapter_name"])
+            subcategories[idx] = classify_being(motif_names[idx], chapter_names[idx])
 
 ollama_corrections_being = 0
 for idx, ollama_label in being_ollama.items():
@@ -939,22 +1161,38 @@ for idx, ollama_label in being_ollama.items():
 
 print(f"\nOllama corrections applied: {ollama_corrections_main} main, {ollama_corrections_being} Being")
 
-# Retrain RF on corrected data for final predictions
-if ollama_corrections_main > 0:
-    print("Retraining main RF with ollama corrections ...")
+# Update the RF with the corrected data for final predictions: the existing
+# trees are kept and only RETRAIN_EXTRA_TREES new ones see the corrections.
+# Only main-category changes count toward the threshold; Being subcategory
+# corrections leave the main forest's training labels untouched.
+if ollama_corrections_main >= MIN_RETRAIN_CORRECTIONS:
+    print(f"Adding {RETRAIN_EXTRA_TREES} trees to the main RF with ollama corrections ...")
     labeled_idx2 = [i for i, c in enumerate(categories) if c is not None]
     X_labeled2 = X_all[labeled_idx2]
     y_labeled2 = [categories[i] for i in labeled_idx2]
-    rf.fit(X_labeled2, y_labeled2)
+    # oob_score off: the reported OOB accuracy stays that of the Step 3 fit
+    n_old_trees = rf.n_estimators
+    rf.set_params(warm_start=True, oob_score=False,
+                  n_estimators=n_old_trees + RETRAIN_EXTRA_TREES)
+    with quiet_warm_start():
+        rf.fit(X_labeled2, y_labeled2)
     # Re-predict only the originally unlabeled ones (minus ollama-corrected)
-    still_unlabeled = [i for i in unlabeled_idx if i not in main_ollama]
-    if still_unlabeled:
+    still_unlabeled = np.fromiter((i for i in unlabeled_idx if i not in main_ollama), dtype=np.intp)
+    if len(still_unlabeled):
+        # The first n_old_trees are Step 3's forest, whose mean probabilities
+        # are already in all_proba; only the new trees walk X_still. Summed
+        # votes, so no division is needed before the argmax.
         X_still = X_all[still_unlabeled]
-        preds2 = rf.predict(X_still)
-        for j, idx in enumerate(still_unlabeled):
-            categories[idx] = preds2[j]
-            if preds2[j] != "Being":
-                subcategories[idx] = preds2[j]
+        votes = all_proba[still_unlabeled] * n_old_trees
+        for tree in rf.estimators_[n_old_trees:]:
+            votes += tree.predict_proba(X_still)
+        preds2 = rf.classes_[votes.argmax(axis=1)]
+        categories[still_unlabeled] = preds2
+        not_being = preds2 != "Being"
+        subcategories[still_unlabeled[not_being]] = preds2[not_being]
+elif ollama_corrections_main > 0:
+    print(f"Keeping {ollama_corrections_main} ollama corrections without retraining "
+          f"(fewer than {MIN_RETRAIN_CORRECTIONS})")
 
 # Final counts
 final_cat_counts = Counter(categories)
@@ -964,13 +1202,13 @@ print(f"\n{'='*70}")
 print("FINAL MAIN CATEGORY DISTRIBUTION")
 print(f"{'='*70}")
 for cat, count in final_cat_counts.most_common():
-    print(f"  {cat:15s}  {count:>6,}  ({100*count/len(rows):.1f}%)")
+    print(f"  {cat:15s}  {count:>6,}  ({100*count/n_motifs:.1f}%)")
 
 print(f"\n{'='*70}")
 print("FINAL SUBCATEGORY DISTRIBUTION")
 print(f"{'='*70}")
 for sc, count in final_subcat_counts.most_common():
-    print(f"  {sc:20s}  {count:>6,}  ({100*count/len(rows):.1f}%)")
+    print(f"  {sc:20s}  {count:>6,}  ({100*count/n_motifs:.1f}%)")
 
 # =====================================================================
 # Step 8: Write output
@@ -992,138 +1230,174 @@ if "category" not in out_fieldnames:
 if "subcategory" not in out_fieldnames:
     out_fieldnames.append("subcategory")
 
+# Plain csv.writer rows in out_fieldnames order: the original fields as read,
+# then the two label columns set by position
+padding = [""] * (len(out_fieldnames) - len(original_fieldnames))
+cat_k = out_fieldnames.index("category")
+sub_k = out_fieldnames.index("subcategory")
+
+def output_rows():
+    for row, cat, subcat in zip(full_rows, categories, subcategories):
+        values = row + padding
+        values[cat_k] = cat
+        values[sub_k] = subcat
+        yield values
+
+# One writerows call: the per-row loop and quoting stay inside the C writer
 with open(orig_path, "w", encoding="utf-8", newline="") as fout:
-    writer = csv.DictWriter(fout, fieldnames=out_fieldnames)
-    writer.writeheader()
-    for i, row in enumerate(full_rows):
-        row["category"] = categories[i]
-        row["subcategory"] = subcategories[i]
-        writer.writerow(row)
+    writer = csv.writer(fout)
+    writer.writerow(out_fieldnames)
+    writer.writerows(output_rows())
 print(f"  Written {orig_path}")
 
 # =====================================================================
 # Step 9: Write report
 # =====================================================================
-report_lines = []
-report_lines.append("TMI Motif Classification Report (Random Forest + Ollama Validation)")
-report_lines.append("=" * 80)
-report_lines.append("")
-report_lines.append("Method: Rule-based classification (Being-priority) + RandomForestClassifier")
-report_lines.append("        + ollama validation/correction on a stratified sample")
-report_lines.append("")
-report_lines.append(f"Total motifs: {len(rows):,}")
-report_lines.append(f"Main category rule-matched: {rule_matched:,} / {len(rows):,} ({100*rule_matched/len(rows):.1f}%)")
-report_lines.append(f"Main RF 5-fold CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
-report_lines.append(f"Main RF OOB accuracy: {rf.oob_score_:.3f}")
-report_lines.append("")
-report_lines.append(f"Being rule-matched: {being_rule_matched:,} / {len(being_idx):,} ({100*being_rule_matched/len(being_idx):.1f}%)")
-report_lines.append(f"Being RF 5-fold CV accuracy: {cv_being.mean():.3f} (+/- {cv_being.std():.3f})")
-report_lines.append(f"Being RF OOB accuracy: {rf_being.oob_score_:.3f}")
-report_lines.append("")
-
-if main_total > 0:
-    report_lines.append(f"Ollama main-category agreement: {main_agree}/{main_total} ({100*main_agree/main_total:.1f}%)")
-if being_total > 0:
-    report_lines.append(f"Ollama Being-subcategory agreement: {being_agree}/{being_total} ({100*being_agree/being_total:.1f}%)")
-report_lines.append(f"Ollama corrections applied: {ollama_corrections_main} main + {ollama_corrections_being} Being")
-report_lines.append("")
-
-CATEGORY_DESCRIPTIONS = {
-    "Being":     "Characters, creatures, deities, supernatural entities, animals-as-characters",
-    "Object":    "Physical and magical items, artifacts, treasures, tools, weapons",
-    "Action":    "Tasks, deceptions, tests, transformations, pursuits, escapes",
-    "Event":     "Narrative happenings: births, deaths, marriages, battles, prophecies",
-    "Place":     "Locations, realms, geographic features, cosmic settings",
-    "Condition": "Tabus, prohibitions, enchantments, curses, rules, compacts",
-    "Origin":    "Etiological motifs: why/how things came to be",
-    "Attribute": "Qualities, characteristics, appearances, properties",
-    "Outcome":   "Rewards, punishments, consequences, fates",
-}
-
-# Main category details
-cat_chapter = defaultdict(Counter)
-for r, cat in zip(rows, categories):
-    cat_chapter[cat][r["chapter_name"]] += 1
-
-for cat, count in final_cat_counts.most_common():
-    report_lines.append(f"\n{'─'*80}")
-    report_lines.append(f"  {cat.upper()}  —  {count:,} motifs ({100*count/len(rows):.1f}%)")
-    report_lines.append(f"  {CATEGORY_DESCRIPTIONS.get(cat, '')}")
-    report_lines.append(f"{'─'*80}")
-    top_ch = cat_chapter[cat].most_common(5)
-    report_lines.append(f"  Top chapters: {', '.join(f'{ch} ({n:,})' for ch, n in top_ch)}")
-    samples = [r["motif_name"] for r, c in zip(rows, categories) if c == cat][:12]
-    report_lines.append(f"  Sample motifs:")
-    for s in samples:
-        report_lines.append(f"    - {s}")
-
-# Being subcategory details
-SUBCAT_DESCRIPTIONS = {
-    "Deity":           "Gods, goddesses, creator figures, demigods, culture heroes",
-    "Human":           "Ordinary people, royalty, social roles, named humans, heroes",
-    "Animal":          "Animals as characters, speaking/helpful/grateful animals",
-    "Spirit":          "Spirits, ghosts, angels, demons, fairies, elves, undead, merfolk",
-    "Monster":         "Giants, monsters, dragons, trolls, cannibals",
-    "Witch/Sorcerer":  "Witches, wizards, sorcerers, magicians, shamans",
-}
-
-report_lines.append(f"\n\n{'='*80}")
-report_lines.append("BEING SUBCATEGORY BREAKDOWN")
-report_lines.append(f"{'='*80}")
-
-being_subcat_counts = Counter(subcategories[i] for i in being_idx)
-subcat_chapter = defaultdict(Counter)
-for i in being_idx:
-    subcat_chapter[subcategories[i]][rows[i]["chapter_name"]] += 1
-
-for sc, count in being_subcat_counts.most_common():
-    report_lines.append(f"\n{'─'*80}")
-    report_lines.append(f"  {sc.upper()}  —  {count:,} motifs ({100*count/len(being_idx):.1f}% of Being)")
-    report_lines.append(f"  {SUBCAT_DESCRIPTIONS.get(sc, '')}")
-    report_lines.append(f"{'─'*80}")
-    top_ch = subcat_chapter[sc].most_common(5)
-    report_lines.append(f"  Top chapters: {', '.join(f'{ch} ({n:,})' for ch, n in top_ch)}")
-    samples = [rows[i]["motif_name"] for i in being_idx if subcategories[i] == sc][:12]
-    report_lines.append(f"  Sample motifs:")
-    for s in samples:
-        report_lines.append(f"    - {s}")
-
-# Cross-tabulation
-all_chapters = sorted(set(r["chapter_name"] for r in rows),
-                      key=lambda ch: -sum(1 for r in rows if r["chapter_name"] == ch))
-all_cats = [cat for cat, _ in final_cat_counts.most_common()]
-
-report_lines.append(f"\n\n{'='*80}")
-report_lines.append("CATEGORY x CHAPTER CROSS-TABULATION")
-report_lines.append(f"{'='*80}")
-report_lines.append(f"\n{'':20s} " + " ".join(f"{cat:>10s}" for cat in all_cats))
-for ch in all_chapters:
-    vals = [cat_chapter[cat].get(ch, 0) for cat in all_cats]
-    report_lines.append(f"{ch:20s} " + " ".join(f"{v:>10,}" for v in vals))
-
-# Ollama disagreements detail
-if main_ollama or being_ollama:
-    report_lines.append(f"\n\n{'='*80}")
-    report_lines.append("OLLAMA VALIDATION DETAILS")
-    report_lines.append(f"{'='*80}")
-
-    if main_ollama:
-        report_lines.append(f"\nMain category validation ({main_total} motifs sampled):")
-        for idx, ollama_label in sorted(main_ollama.items()):
-            current = categories[idx]
-            status = "AGREE" if ollama_label == current else f"CORRECTED {current}->{ollama_label}"
-            report_lines.append(f"  [{rows[idx]['chapter_name']:20s}] {rows[idx]['motif_name'][:60]:60s}  {status}")
-
-    if being_ollama:
-        report_lines.append(f"\nBeing subcategory validation ({being_total} motifs sampled):")
-        for idx, ollama_label in sorted(being_ollama.items()):
-            current = subcategories[idx]
-            status = "AGREE" if ollama_label == current else f"CORRECTED {current}->{ollama_label}"
-            report_lines.append(f"  [{rows[idx]['chapter_name']:20s}] {rows[idx]['motif_name'][:60]:60s}  {status}")
-
 report_path = os.path.join(DATA_DIR, "rf_classification_report.txt")
-with open(report_path, "w", encoding="utf-8") as f:
-    f.write("\n".join(report_lines))
+# Lines go straight to the file as they are produced
+with open(report_path, "w", encoding="utf-8") as report:
+    print("TMI Motif Classification Report (Random Forest + Ollama Validation)", file=report)
+    print("=" * 80, file=report)
+    print("", file=report)
+    print("Method: Rule-based classification (Being-priority) + RandomForestClassifier", file=report)
+    print("        + ollama validation/correction on a stratified sample", file=report)
+    print("", file=report)
+    print(f"Total motifs: {n_motifs:,}", file=report)
+    print(f"Main category rule-matched: {rule_matched:,} / {n_motifs:,} ({100*rule_matched/n_motifs:.1f}%)", file=report)
+    if CROSS_VALIDATE:
+        print(f"Main RF 5-fold CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})", file=report)
+    print(f"Main RF OOB accuracy: {rf.oob_score_:.3f} (+/- {main_oob_se:.3f})", file=report)
+    print("", file=report)
+    print(f"Being rule-matched: {being_rule_matched:,} / {len(being_idx):,} ({100*being_rule_matched/len(being_idx):.1f}%)", file=report)
+    if CROSS_VALIDATE:
+        print(f"Being RF 5-fold CV accuracy: {cv_being.mean():.3f} (+/- {cv_being.std():.3f})", file=report)
+    print(f"Being RF OOB accuracy: {rf_being.oob_score_:.3f} (+/- {being_oob_se:.3f})", file=report)
+    print("", file=report)
+
+    if main_total > 0:
+        print(f"Ollama main-category agreement: {main_agree}/{main_total} ({100*main_agree/main_total:.1f}%)", file=report)
+    if being_total > 0:
+        print(f"Ollama Being-subcategory agreement: {being_agree}/{being_total} ({100*being_agree/being_total:.1f}%)", file=report)
+    print(f"Ollama corrections applied: {ollama_corrections_main} main + {ollama_corrections_being} Being", file=report)
+    print("", file=report)
+
+    CATEGORY_DESCRIPTIONS = {
+        "Being":     "Characters, creatures, deities, supernatural entities, animals-as-characters",
+        "Object":    "Physical and magical items, artifacts, treasures, tools, weapons",
+        "Action":    "Tasks, deceptions, tests, transformations, pursuits, escapes",
+        "Event":     "Narrative happenings: births, deaths, marriages, battles, prophecies",
+        "Place":     "Locations, realms, geographic features, cosmic settings",
+        "Condition": "Tabus, prohibitions, enchantments, curses, rules, compacts",
+        "Origin":    "Etiological motifs: why/how things came to be",
+        "Attribute": "Qualities, characteristics, appearances, properties",
+        "Outcome":   "Rewards, punishments, consequences, fates",
+    }
+
+    # Label x chapter count matrices, tallied with one np.add.at per table. Chapter
+    # columns are in first-appearance order, which is the tie order most_common gave.
+    chapter_list = list(dict.fromkeys(chapter_names))
+    chapter_pos = {ch: k for k, ch in enumerate(chapter_list)}
+    chapter_of = np.array([chapter_pos[ch] for ch in chapter_names], dtype=np.intp)
+
+    def top_chapters(chapter_row, n=5):
+        """The n largest (chapter, count) cells of one count-matrix row."""
+        return [(chapter_list[k], chapter_row[k])
+                for k in np.argsort(-chapter_row, kind="stable")[:n] if chapter_row[k]]
+
+    # Main category details
+    cat_pos = {cat: k for k, cat in enumerate(final_cat_counts)}
+    cat_chapter = np.zeros((len(cat_pos), len(chapter_list)), dtype=np.int64)
+    np.add.at(cat_chapter, ([cat_pos[cat] for cat in categories], chapter_of), 1)
+
+    # First 12 motifs of each category, gathered in the same row order
+    cat_samples = defaultdict(list)
+    for name, cat in zip(motif_names, categories):
+        if len(cat_samples[cat]) < 12:
+            cat_samples[cat].append(name)
+
+    for cat, count in final_cat_counts.most_common():
+        print(f"\n{'─'*80}", file=report)
+        print(f"  {cat.upper()}  —  {count:,} motifs ({100*count/n_motifs:.1f}%)", file=report)
+        print(f"  {CATEGORY_DESCRIPTIONS.get(cat, '')}", file=report)
+        print(f"{'─'*80}", file=report)
+        top_ch = top_chapters(cat_chapter[cat_pos[cat]])
+        print(f"  Top chapters: {', '.join(f'{ch} ({n:,})' for ch, n in top_ch)}", file=report)
+        print(f"  Sample motifs:", file=report)
+        for s in cat_samples[cat]:
+            print(f"    - {s}", file=report)
+
+    # Being subcategory details
+    SUBCAT_DESCRIPTIONS = {
+        "Deity":           "Gods, goddesses, creator figures, demigods, culture heroes",
+        "Human":           "Ordinary people, royalty, social roles, named humans, heroes",
+        "Animal":          "Animals as characters, speaking/helpful/grateful animals",
+        "Spirit":          "Spirits, ghosts, angels, demons, fairies, elves, undead, merfolk",
+        "Monster":         "Giants, monsters, dragons, trolls, cannibals",
+        "Witch/Sorcerer":  "Witches, wizards, sorcerers, magicians, shamans",
+    }
+
+    print(f"\n\n{'='*80}", file=report)
+    print("BEING SUBCATEGORY BREAKDOWN", file=report)
+    print(f"{'='*80}", file=report)
+
+    # Counts, matrix row of each Being motif and first 12 samples in one pass
+    being_subcat_counts = Counter()
+    subcat_pos = {}
+    subcat_rows = []
+    subcat_samples = defaultdict(list)
+    for i in being_idx:
+        sc = subcategories[i]
+        being_subcat_counts[sc] += 1
+        subcat_rows.append(subcat_pos.setdefault(sc, len(subcat_pos)))
+        if len(subcat_samples[sc]) < 12:
+            subcat_samples[sc].append(motif_names[i])
+    subcat_chapter = np.zeros((len(subcat_pos), len(chapter_list)), dtype=np.int64)
+    np.add.at(subcat_chapter, (subcat_rows, chapter_of[being_idx]), 1)
+
+    for sc, count in being_subcat_counts.most_common():
+        print(f"\n{'─'*80}", file=report)
+        print(f"  {sc.upper()}  —  {count:,} motifs ({100*count/len(being_idx):.1f}% of Being)", file=report)
+        print(f"  {SUBCAT_DESCRIPTIONS.get(sc, '')}", file=report)
+        print(f"{'─'*80}", file=report)
+        top_ch = top_chapters(subcat_chapter[subcat_pos[sc]])
+        print(f"  Top chapters: {', '.join(f'{ch} ({n:,})' for ch, n in top_ch)}", file=report)
+        print(f"  Sample motifs:", file=report)
+        for s in subcat_samples[sc]:
+            print(f"    - {s}", file=report)
+
+    # Cross-tabulation
+    # Column totals of the main table are the chapter sizes
+    all_chapters = [chapter_list[k] for k in np.argsort(-cat_chapter.sum(axis=0), kind="stable")]
+    all_cats = [cat for cat, _ in final_cat_counts.most_common()]
+
+    print(f"\n\n{'='*80}", file=report)
+    print("CATEGORY x CHAPTER CROSS-TABULATION", file=report)
+    print(f"{'='*80}", file=report)
+    print(f"\n{'':20s} " + " ".join(f"{cat:>10s}" for cat in all_cats), file=report)
+    for ch in all_chapters:
+        vals = cat_chapter[[cat_pos[cat] for cat in all_cats], chapter_pos[ch]]
+        print(f"{ch:20s} " + " ".join(f"{v:>10,}" for v in vals), file=report)
+
+    # Ollama disagreements detail
+    if main_ollama or being_ollama:
+        print(f"\n\n{'='*80}", file=report)
+        print("OLLAMA VALIDATION DETAILS", file=report)
+        print(f"{'='*80}", file=report)
+
+        if main_ollama:
+            print(f"\nMain category validation ({main_total} motifs sampled):", file=report)
+            for idx, ollama_label in sorted(main_ollama.items()):
+                current = categories[idx]
+                status = "AGREE" if ollama_label == current else f"CORRECTED {current}->{ollama_label}"
+                print(f"  [{chapter_names[idx]:20s}] {motif_names[idx][:60]:60s}  {status}", file=report)
+
+        if being_ollama:
+            print(f"\nBeing subcategory validation ({being_total} motifs sampled):", file=report)
+            for idx, ollama_label in sorted(being_ollama.items()):
+                current = subcategories[idx]
+                status = "AGREE" if ollama_label == current else f"CORRECTED {current}->{ollama_label}"
+                print(f"  [{chapter_names[idx]:20s}] {motif_names[idx][:60]:60s}  {status}", file=report)
+
 print(f"\nWritten {report_path}")
 
 print("\nDone.")
@@ -0,0 +1,16 @@
+"""
+Point-layer drawing shared by the UMAP scatter scripts (cluster_tropes.py,
+split_being.py, visualize_clusters.py).
+
+The scripts run from data/, so they import this module directly.
+"""
+
+
+def plot_points(ax, x, y, color, size, alpha, label=None):
+    """Draw the points x/y onto ax in a single color."""
+    # One color and size per layer, so a marker-only line is enough: it
+    # stamps a single marker path instead of scatter's per-point collection.
+    # markersize is a diameter in points, scatter's s an area in points^2
+    ax.plot(x, y, linestyle="", marker="o",
+            markersize=size ** 0.5, markerfacecolor=color, markeredgecolor="none",
+            alpha=alpha, label=label, rasterized=True)
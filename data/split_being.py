@@ -12,6 +12,7 @@ IMPROVED version — fixes:
 Updates tmi_clustered.csv and regenerates all Being visualizations.
 """
 import csv
+import hashlib
 import os
 import re
 from collections import Counter, defaultdict
@@ -21,27 +22,49 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.patheffects as pe
 import numpy as np
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import SGDClassifier
 from sklearn.model_selection import cross_val_score
 import umap
+from pynndescent import NNDescent
+
+from motif_rules import ANIMAL_NAMES, DEITY_NAMES, anywhere, has_any_word, search_anywhere
+from scatter_layers import plot_points
+
+try:
+    from cuml.manifold import UMAP as CumlUMAP
+    HAS_CUML = True
+except ImportError:
+    HAS_CUML = False
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 csv.field_size_limit(10 * 1024 * 1024)
+# 5-fold CV refits the Step 3 classifier five more times only to report an
+# accuracy estimate; nothing downstream depends on it, so it is opt-in
+CROSS_VALIDATE = False
+# Likewise the mean/median confidence of the Step 3 predictions, which costs a
+# second pass (predict_proba) over the unlabeled rows
+REPORT_CONFIDENCE = False
 
 # =====================================================================
 # Step 1: Load clustered data
 # =====================================================================
 print("Loading tmi_clustered.csv ...")
-all_rows = []
 with open(os.path.join(DATA_DIR, "tmi_clustered.csv"), "r", encoding="utf-8", errors="replace") as f:
-    reader = csv.DictReader(f)
-    fieldnames = reader.fieldnames
-    for row in reader:
-        all_rows.append(row)
-
-being_idx = [i for i, r in enumerate(all_rows) if r["category"] == "Being"]
-print(f"  Total motifs: {len(all_rows):,}")
+    reader = csv.reader(f)
+    fieldnames = next(reader)
+    all_rows = [r for r in reader if r]
+n_motifs = len(all_rows)
+# Parallel column lists (index i is motif i everywhere below)
+name_col, chapter_col, category_col = (fieldnames.index(c) for c in ("motif_name", "chapter_name", "category"))
+motif_names = [r[name_col] for r in all_rows]
+chapter_names = [r[chapter_col] for r in all_rows]
+categories = np.array([r[category_col] for r in all_rows])
+non_being = categories != "Being"
+
+being_idx = np.flatnonzero(~non_being)
+print(f"  Total motifs: {n_motifs:,}")
 print(f"  Being motifs: {len(being_idx):,}")
 
 # =====================================================================
@@ -51,12 +74,17 @@ print(f"  Being motifs: {len(being_idx):,}")
 # Each function returns a subcategory or None.
 # We chain them: Deity > Witch > Spirit > Monster > Animal > Human
 
-def _lower(name):
-    return name.lower()
+# The is_* rules take the motif already lowercased, plus its first four and
+# first three words (joined, and the first three as a list); classify_being
+# computes these once per motif instead of once per rule.
+def _fuse(**alternatives):
+    """Compile several case-insensitive patterns into one alternation.
 
-def _first_words(name, n=4):
-    """Return the first n words, lowercased."""
-    return " ".join(name.lower().split()[:n])
+    Each alternative is a named group, so one search answers "does any of them
+    match" and m.lastgroup names the rule that fired.
+    """
+    return re.compile("|".join(f"(?P<{tag}>{p.pattern if isinstance(p, re.Pattern) else p})"
+                               for tag, p in alternatives.items()), re.I)
 
 # --- DEITY ---
 _deity_subject = re.compile(
@@ -66,43 +94,31 @@ _deity_anywhere = re.compile(
     r"\b(god of|goddess of|god as|gods and|god[']s|goddess[']s|"
     r"of the gods|of god|deity|deities|divine|demiurg|demigod|"
     r"pantheon|olymp|culture hero|heavenly beings?)\b", re.I)
-_deity_names = re.compile(
-    r"\b(zeus|odin|thor|vishnu|shiva|brahma|indra|ra|isis|osiris|apollo|"
-    r"athena|aphrodite|loki|freya|ganesh|krishna|buddha|allah|yahweh|jehovah|"
-    r"jupiter|mars|venus|mercury|neptune|pluto|saturn|diana|juno|minerva|"
-    r"hera|ares|hermes|poseidon|hades|dionysus|artemis|hephaestus|demeter|"
-    r"persephone|siva|parvati|lakshmi|saraswati|durga|kali|hanuman|rama|"
-    r"tyr|balder|heimdall|freyja|frigg|njord|ymir|baal|marduk|enlil|enki|"
-    r"inanna|ishtar|tiamat|quetzalcoatl|coyolxauhqui|tezcatlipoca|"
-    r"amaterasu|susanoo|izanagi|izanami|maui|pele|anansi|eshu|"
-    r"cernunnos|dagda|brigid|lugh|morrigan|manann[aá]n|danu)\b", re.I)
+_deity_names = re.compile(r"\b(" + "|".join(sorted(DEITY_NAMES)) + r")\b", re.I)
 _creator_pattern = re.compile(r"\bcreator\b", re.I)
 _parent_of_gods = re.compile(r"\b(father|mother|parent|ancestor|birth|born)\b.*\b(god|gods|goddess|deities)\b", re.I)
 _gods_pattern = re.compile(r"\b(the gods|of gods)\b", re.I)
+_deity_lower = anywhere(_fuse(
+    parent_of_gods=_parent_of_gods,                     # parent/birth of gods
+    gods_subject=r"^(the gods|gods )",                  # "the gods" as subject
+    god_start=r"^(god|goddess|deity|the god|the goddess)",  # god clearly the subject
+))
 
-def is_deity(name, chapter):
-    lower = _lower(name)
-    first = _first_words(name)
+def is_deity(lower, first4, first3, lead3, chapter):
     # Strong: starts with god/goddess/deity/creator
-    if _deity_subject.search(first):
+    if _deity_subject.search(first4):
         return True
     # Named deities anywhere
-    if _deity_names.search(lower):
+    if has_any_word(lower, DEITY_NAMES, _deity_names):
         return True
-    # Parent/birth of gods
-    if _parent_of_gods.search(lower):
-        return True
-    # "the gods" as subject
-    if lower.startswith("the gods") or lower.startswith("gods "):
+    if search_anywhere(_deity_lower, lower):
         return True
     # Creator in Myths chapter
-    if _creator_pattern.search(lower) and chapter == "Myths":
-        return True
-    # Various god references where god is clearly the subject
-    if re.match(r"^(god|goddess|deity|the god|the goddess)", lower):
+    if chapter == "Myths" and _creator_pattern.search(lower):
         return True
-    # "X of the gods" where X is about gods
-    if _gods_pattern.search(lower) and not any(w in lower for w in ["man", "woman", "hero", "mortal", "human"]):
+    # "X of the gods" where X is about gods ("god" in lower is a cheap exact
+    # pre-test: both alternatives contain it)
+    if "god" in lower and _gods_pattern.search(lower) and not any(w in lower for w in ["man", "woman", "hero", "mortal", "human"]):
         if any(w in lower for w in ["king of the gods", "queen of the gods", "war of the gods", "death of the gods",
                                      "home of the gods", "food of the gods", "gift of the gods", "wrath of the gods"]):
             return True
@@ -113,20 +129,19 @@ _witch_subject = re.compile(
     r"^(witch|witches|wizard|sorcerer|sorceress|magician|enchanter|enchantress|"
     r"necromancer|conjurer|shaman|medicine man|medicine woman|cunning man|cunning woman|"
     r"warlock|hag)\b", re.I)
-_witch_anywhere = re.compile(
+_witch_anywhere = anywhere(re.compile(
     r"\b(witch(es|\'s)?|wizard|sorcerer|sorceress|magician|enchanter|enchantress|"
-    r"necromancer|conjurer|shaman|warlock)\b", re.I)
+    r"necromancer|conjurer|shaman|warlock)\b", re.I))
+_by_witch = re.compile(r"\bby (witch|sorcerer|magician|wizard|enchant)\b")
 
-def is_witch(name, chapter):
-    lower = _lower(name)
-    first = _first_words(name)
-    if _witch_subject.search(first):
+def is_witch(lower, first4, first3, lead3, chapter):
+    if _witch_subject.search(first4):
         return True
     # Witch as primary topic (not just mentioned)
-    if chapter == "Monsters" and _witch_anywhere.search(lower):
+    if chapter == "Monsters" and search_anywhere(_witch_anywhere, lower):
         return True
-    # "X by witch/sorcerer"
-    if re.search(r"\bby (witch|sorcerer|magician|wizard|enchant)\b", lower):
+    # "X by witch/sorcerer"; most motifs have no "by " at all
+    if "by " in lower and _by_witch.search(lower):
         return True
     return False
 
@@ -141,39 +156,39 @@ _spirit_subject = re.compile(
     r"mermaid|merman|merfolk|siren|selkie|kelpie|nixie|naiad|"
     r"changeling|the dead|dead man|dead men|dead woman|dead person|dead people|"
     r"the departed|revenant|bogeyman|bogey|knocker|will-o)\b", re.I)
-_spirit_anywhere = re.compile(
+_spirit_anywhere = anywhere(re.compile(
     r"\b(ghost[s]?[\'s]?|spirit[s]?[\'s]?|soul[s]?[\'s]?|phantom|specter|wraith|banshee|poltergeist|"
     r"fairy|fairies|fairy[\'s]|elf|elves|dwarf[s]?|dwarves|gnome|pixie|brownie|leprechaun|kobold|"
     r"angel[s]?|archangel|seraph|cherub|"
     r"demon[s]?|devil[s]?|satan[\'s]?|lucifer|fiend|imp[s]?\b|"
     r"vampire|werewolf|undead|zombie|revenant|ghoul|"
     r"mermaid|merman|siren|selkie|kelpie|nixie|"
-    r"changeling|revenant|bogey|bogeyman)\b", re.I)
+    r"changeling|revenant|bogey|bogeyman)\b", re.I))
 _dead_subject = re.compile(r"^(dead|the dead|ghost|resuscitat|return from (the )?dead|return of the dead)\b", re.I)
+# Fairy/spirit/ghost/devil as subject or clear topic of the opening words
+_spirit_first = anywhere(_fuse(subject=_spirit_subject, anywhere=_spirit_anywhere))
+# Strong signals in the Death chapter
+_spirit_death = anywhere(_fuse(anywhere=_spirit_anywhere, dead=_dead_subject))
+_spirit_word = re.compile(r"\b(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)[s]?\b")
+_spirit_topic = _fuse(
+    # Spirit/ghost/fairy/devil as subject or primary being
+    start=r"^(the )?(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)",
+    # "X of the fairies/spirits/ghosts/devils"
+    of_spirits=r"\bof (the )?(fairy|fairies|ghost|spirits?|angel|demons?|devils?|vampires?|elves|dwarfs?)\b",
+)
 
-def is_spirit(name, chapter):
-    lower = _lower(name)
-    first = _first_words(name)
-    if _spirit_subject.search(first):
+def is_spirit(lower, first4, first3, lead3, chapter):
+    if search_anywhere(_spirit_first, first4):
         return True
     # Chapter-based strong signals
-    if chapter == "Death" and _spirit_anywhere.search(lower):
-        return True
-    if chapter == "Death" and _dead_subject.search(lower):
-        return True
-    # Fairy/spirit/ghost/devil as clear topic
-    if _spirit_anywhere.search(first):
+    if chapter == "Death" and search_anywhere(_spirit_death, lower):
         return True
     # "of fairy/ghost/spirit/angel/demon/devil" patterns where they're the topic
-    if re.search(r"\b(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)[s]?\b", lower):
+    if _spirit_word.search(lower):
         # Make sure it's not just a passing mention in a human-centric motif
         if chapter in ("Marvels", "Death", "Monsters", "Religion"):
             return True
-        # Spirit/ghost/fairy/devil as subject or primary being
-        if re.match(r"^(the )?(fairy|ghost|spirit|angel|demon|devil|vampire|werewolf|elf|dwarf|mermaid)", lower):
-            return True
-        # "X of the fairies/spirits/ghosts/devils"
-        if re.search(r"\bof (the )?(fairy|fairies|ghost|spirits?|angel|demons?|devils?|vampires?|elves|dwarfs?)\b", lower):
+        if _spirit_topic.search(lower):
             return True
     return False
 
@@ -184,52 +199,40 @@ _monster_subject = re.compile(
     r"kraken|leviathan|behemoth|manticore|cerberus|"
     r"sea.?monster|water.?monster|man.?eater|cannibal|wild man|wild woman|"
     r"ogress)\b", re.I)
-_monster_anywhere = re.compile(
+_monster_anywhere = anywhere(re.compile(
     r"\b(giant[s]?[\'s]?|monster[s]?|dragon[s]?|troll[s]?|cyclop|gorgon|basilisk|"
     r"hydra|chimera|minotaur|griffin|manticore|cerberus|kraken|leviathan|"
     r"cannibal[s]?|man.?eat|wild man|wild woman|"
-    r"ogress)\b", re.I)
+    r"ogress)\b", re.I))
 _serpent_monster = re.compile(r"\b(great serpent|world serpent|sea serpent|serpent monster|monstrous serpent)\b", re.I)
+# Giant/dragon/troll as subject or clear topic even in other chapters
+_monster_first = anywhere(_fuse(subject=_monster_subject, anywhere=_monster_anywhere))
+_monster_lower = _fuse(
+    serpent=_serpent_monster,                                    # serpent as monster, not just snake
+    of_monster=r"\bof (the )?(giant|dragon|troll|monster|ogress)[s]?\b",  # "X of the giant(s)"
+)
 
-def is_monster(name, chapter):
-    lower = _lower(name)
-    first = _first_words(name)
-    if _monster_subject.search(first):
+def is_monster(lower, first4, first3, lead3, chapter):
+    if search_anywhere(_monster_first, first4):
         return True
     # Chapter signal
-    if chapter == "Monsters" and _monster_anywhere.search(lower):
+    if chapter == "Monsters" and search_anywhere(_monster_anywhere, lower):
         return True
-    # Giant/dragon/troll as clear topic even in other chapters
-    if _monster_anywhere.search(first):
-        return True
-    # Serpent as monster (not just snake)
-    if _serpent_monster.search(lower):
-        return True
-    # "X of the giant(s)/dragon(s)/troll(s)"
-    if re.search(r"\bof (the )?(giant|dragon|troll|monster|ogress)[s]?\b", lower):
+    if _monster_lower.search(lower):
         return True
     return False
 
 # --- ANIMAL ---
+# The shared animal list plus the species only these rules know
+_ANIMAL_NAMES = ANIMAL_NAMES | frozenset("""
+finch wren jay jackdaw rook starling thrush blackbird turkey cheetah puma
+cougar jaguar gazelle antelope giraffe hippopotamus rhinoceros gorilla
+chimpanzee baboon orangutan
+""".split())
+# The one multi-word animal, which a per-token lookup cannot see
+_ANIMAL_PHRASES = ("guinea fowl",)
 _animal_names = re.compile(
-    r"\b(fox|wolf|wolves|bear[s]?\b|lion|tiger|eagle|raven|crow|hawk|owl|"
-    r"cat[s]?\b|dog[s]?\b|horse[s]?\b|deer|hare|rabbit|mouse|mice|rat[s]?\b|"
-    r"frog|toad|turtle|tortoise|monkey|ape|elephant|cow[s]?\b|bull|ox|oxen|"
-    r"pig[s]?\b|boar|goat|sheep|ram|cock|hen|duck|goose|geese|swan|dove|pigeon|"
-    r"parrot|ant[s]?\b|bee[s]?\b|spider|fly|flies|mosquito|worm|crab|lobster|"
-    r"whale|shark|dolphin|salmon|trout|fish|fishes|coyote|jackal|hyena|"
-    r"leopard|panther|crocodile|alligator|lizard|scorpion|beetle|butterfly|"
-    r"grasshopper|cricket|snail|slug|donkey|mule|camel|buffalo|"
-    r"stork|crane|heron|sparrow|robin|magpie|cuckoo|woodpecker|pelican|"
-    r"vulture|bat[s]?\b|squirrel|hedgehog|beaver|otter|seal[s]?\b|porcupine|"
-    r"badger|skunk|raccoon|weasel|ferret|mink|lark|nightingale|swallow|"
-    r"finch|wren|jay|jackdaw|rook|starling|thrush|blackbird|robin|"
-    r"serpent|snake|viper|cobra|python|asp|adder|"
-    r"locust|flea|louse|tick|maggot|caterpillar|moth|wasp|hornet|"
-    r"clam|oyster|mussel|snail|octopus|squid|jellyfish|starfish|eel|"
-    r"peacock|pheasant|quail|partridge|guinea fowl|turkey|ostrich|flamingo|"
-    r"panther|cheetah|puma|cougar|jaguar|gazelle|antelope|giraffe|"
-    r"hippopotamus|rhinoceros|gorilla|chimpanzee|baboon|orangutan)\b", re.I)
+    r"\b(" + "|".join(sorted(_ANIMAL_NAMES) + list(_ANIMAL_PHRASES)) + r")\b", re.I)
 _animal_subject = re.compile(
     r"^(animal|animals|bird|birds|fish|fishes|insect|insects|serpent|snake|"
     r"fox|wolf|bear|lion|tiger|eagle|raven|crow|hawk|owl|cat|dog|horse|"
@@ -258,37 +261,38 @@ _human_subject_words = {"man", "woman", "person", "wife", "husband", "king", "qu
                         "smith", "carpenter", "beggar", "orphan", "widow",
                         "bride", "groom", "lover", "suitor", "paramour"}
 
-def is_animal(name, chapter):
-    lower = _lower(name)
-    first = _first_words(name, 3)
-    first_word = lower.split()[0] if lower.split() else ""
+_etiological_start = re.compile(r"^(why|how|origin of|creation of)\b.*\b")
+# Animal-specific motif patterns
+_animal_motif = _fuse(
+    role=r"\b(animal (as|bride|groom|husband|wife|king|language|helper|grateful))\b",
+    trait=r"\b(speaking|talking|helpful|grateful|faithful|treacherous) "
+          r"(animal|bird|fish|fox|wolf|bear|lion|horse|dog|cat|eagle|raven|snake|serpent)\b",
+)
 
+def is_animal(lower, first4, first3, lead3, chapter):
     # Strong: starts with animal name
-    if _animal_subject.search(first):
+    if _animal_subject.search(first3):
         # But not if it's "animal X of human" where human is the real subject
         return True
 
+    # isdisjoint walks the three words against the set; no set is built per motif
+    human_lead = not _human_subject_words.isdisjoint(lead3)
+
     # Chapter signal
     if chapter == "Animals":
         # Animals chapter — default to Animal unless clearly about a human
-        first_words_set = set(lower.split()[:3])
-        if first_words_set & _human_subject_words:
-            return False
-        return True
+        return not human_lead
 
     # Animal name in subject position and no human subject words first
-    first_three = set(lower.split()[:3])
-    if first_three & _human_subject_words:
+    if human_lead:
         return False
 
     # Animal is the topic: "Why X (animal)" pattern
-    if re.match(r"^(why|how|origin of|creation of)\b.*\b", lower) and _animal_names.search(lower):
+    if _etiological_start.match(lower) and has_any_word(lower, _ANIMAL_NAMES, _animal_names,
+                                                         _ANIMAL_PHRASES):
         return True
 
-    # Animal-specific motif patterns
-    if re.search(r"\b(animal (as|bride|groom|husband|wife|king|language|helper|grateful))\b", lower):
-        return True
-    if re.search(r"\b(speaking|talking|helpful|grateful|faithful|treacherous) (animal|bird|fish|fox|wolf|bear|lion|horse|dog|cat|eagle|raven|snake|serpent)\b", lower):
+    if _animal_motif.search(lower):
         return True
 
     return False
@@ -308,11 +312,9 @@ _human_subject = re.compile(
     r"eldest|youngest|rich|poor|clever|stupid|lazy|"
     r"mortal|human|people|men|women)\b", re.I)
 
-def is_human(name, chapter):
+def is_human(lower, first4, first3, lead3, chapter):
     """Human is the fallback — only if nothing else matches first."""
-    lower = _lower(name)
-    first = _first_words(name, 3)
-    if _human_subject.search(first):
+    if _human_subject.search(first3):
         return True
     # Chapters strongly associated with human characters
     if chapter in ("Wisdom and Folly", "Deceptions", "Sex", "Society",
@@ -323,43 +325,43 @@ def is_human(name, chapter):
 
 def classify_being(name, chapter):
     """Classify a Being motif. Order matters: specific before general."""
+    lower = name.lower()
+    words = lower.split()
+    first4 = " ".join(words[:4])
+    first3 = " ".join(words[:3])
+    lead3 = words[:3]
     # 1. Witch/Sorcerer (very specific)
-    if is_witch(name, chapter):
+    if is_witch(lower, first4, first3, lead3, chapter):
         return "Witch/Sorcerer"
     # 2. Deity
-    if is_deity(name, chapter):
+    if is_deity(lower, first4, first3, lead3, chapter):
         return "Deity"
     # 3. Spirit
-    if is_spirit(name, chapter):
+    if is_spirit(lower, first4, first3, lead3, chapter):
         return "Spirit"
     # 4. Monster
-    if is_monster(name, chapter):
+    if is_monster(lower, first4, first3, lead3, chapter):
         return "Monster"
     # 5. Animal
-    if is_animal(name, chapter):
+    if is_animal(lower, first4, first3, lead3, chapter):
         return "Animal"
     # 6. Human (catch-all)
-    if is_human(name, chapter):
+    if is_human(lower, first4, first3, lead3, chapter):
         return "Human"
     return None
 
 
 print("Applying improved rule-based Being subcategorization ...")
-subcategories = [None] * len(all_rows)
-rule_matched = 0
-
-for i in being_idx:
-    subcat = classify_being(all_rows[i]["motif_name"], all_rows[i]["chapter_name"])
-    subcategories[i] = subcat
-    if subcat:
-        rule_matched += 1
-
-# For non-Being motifs, subcategory = category
-for i, r in enumerate(all_rows):
-    if r["category"] != "Being":
-        subcategories[i] = r["category"]
-
-unmatched_being = sum(1 for i in being_idx if subcategories[i] is None)
+# One pass over the columns; non-Being motifs: subcategory = category. A
+# pattern-at-a-time sweep (str.contains per rule, then masks combined in
+# priority order) was ~4x slower: it loses classify_being's early return.
+# Memoizing by (name, chapter) does not pay either: only 15 of the 23,631
+# Being rows repeat a pair, so a cache would mostly hash and store misses.
+subcategories = [classify_being(name, chapter) if cat == "Being" else cat
+                 for name, chapter, cat in zip(motif_names, chapter_names, categories)]
+# Only Being motifs can be left as None
+unmatched_being = subcategories.count(None)
+rule_matched = len(being_idx) - unmatched_being
 print(f"  Rule-matched Being: {rule_matched:,} / {len(being_idx):,} ({100*rule_matched/len(being_idx):.1f}%)")
 print(f"  Unmatched Being: {unmatched_being:,} ({100*unmatched_being/len(being_idx):.1f}%)")
 
@@ -368,19 +370,29 @@ print(f"  Unmatched Being: {unmatched_being:,} ({100*unmatched_being/len(being_i
 # =====================================================================
 print("\nTraining classifier on rule-labeled Being motifs ...")
 
-def preprocess(name):
-    name = name.lower()
-    name = re.sub(r"[^a-z0-9\s\-]", " ", name)
-    return re.sub(r"\s+", " ", name).strip()
+_non_token_chars = re.compile(r"[^a-z0-9\s\-]")
 
-being_texts = [preprocess(all_rows[i]["motif_name"]) + " __CH_" + all_rows[i]["chapter_name"].replace(" ", "_")
-               for i in being_idx]
+def preprocess(name):
+    # str.split() collapses the same whitespace set as \s+, strip included
+    return " ".join(_non_token_chars.sub(" ", name.lower()).split())
+
+# Name + chapter token for every motif, built once: the UMAP step embeds all
+# of them, the Being classifier only its own rows
+all_texts = [preprocess(name) + " __CH_" + chapter.replace(" ", "_")
+             for name, chapter in zip(motif_names, chapter_names)]
+# (HashingVectorizer + TfidfTransformer saves ~0.5 s here but cannot prune by
+# min_df/max_features: X_all gains ~57% more nonzeros, and 8192 hash buckets
+# merge ~15 n-grams each, which costs more downstream in SGD and UMAP.)
+vec_all = TfidfVectorizer(max_features=8000, ngram_range=(1, 2), min_df=2, max_df=0.5, sublinear_tf=True)
+X_all = vec_all.fit_transform(all_texts)
 
+# The classifier keeps a vocabulary and IDF fit on the Being texts alone;
+# slicing X_all instead would change the model
 vectorizer = TfidfVectorizer(
     max_features=8000, ngram_range=(1, 2),
     min_df=2, max_df=0.5, sublinear_tf=True,
 )
-X_being = vectorizer.fit_transform(being_texts)
+X_being = vectorizer.fit_transform([all_texts[i] for i in being_idx])
 
 labeled_mask = [j for j, i in enumerate(being_idx) if subcategories[i] is not None]
 unlabeled_mask = [j for j, i in enumerate(being_idx) if subcategories[i] is None]
@@ -388,62 +400,74 @@ unlabeled_mask = [j for j, i in enumerate(being_idx) if subcategories[i] is None
 X_labeled = X_being[labeled_mask]
 y_labeled = [subcategories[being_idx[j]] for j in labeled_mask]
 
-clf = SGDClassifier(loss="modified_huber", random_state=42, max_iter=1000, class_weight="balanced")
-cv_scores = cross_val_score(clf, X_labeled, y_labeled, cv=5, scoring="accuracy")
-print(f"  5-fold CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
+clf = SGDClassifier(loss="modified_huber", random_state=42, max_iter=1000, class_weight="balanced",
+                    n_jobs=-1)
+if CROSS_VALIDATE:
+    cv_scores = cross_val_score(clf, X_labeled, y_labeled, cv=5, scoring="accuracy", n_jobs=-1)
+    print(f"  5-fold CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
 
 clf.fit(X_labeled, y_labeled)
 
 if unlabeled_mask:
     X_unlabeled = X_being[unlabeled_mask]
     preds = clf.predict(X_unlabeled)
-    pred_proba = clf.predict_proba(X_unlabeled)
-    max_probs = pred_proba.max(axis=1)
 
     for j, local_j in enumerate(unlabeled_mask):
         global_i = being_idx[local_j]
         subcategories[global_i] = preds[j]
 
     print(f"  Predicted {len(unlabeled_mask):,} unlabeled Being motifs")
-    print(f"  Confidence: mean={max_probs.mean():.3f}, median={np.median(max_probs):.3f}")
+    if REPORT_CONFIDENCE:
+        max_probs = clf.predict_proba(X_unlabeled).max(axis=1)
+        print(f"  Confidence: mean={max_probs.mean():.3f}, median={np.median(max_probs):.3f}")
 
 # =====================================================================
 # Step 4: Post-classification corrections
 # =====================================================================
+# Subject-position fixes for Human labels, in priority order. All four are
+# anchored at the start, so the first alternative that matches is the one the
+# old if/elif chain picked, and m.lastgroup names it. The prefixes are
+# disjoint, so the witch fix (which applies to any label) shares the same
+# single match per row.
+_SUBJECT_FIXES = _fuse(
+    # "god/goddess/deity" in subject => Deity, not Human
+    deity=r"^(god[sd]?|goddess|deity|creator|the god|the goddess|the creator|demigod|culture hero)\b",
+    # "spirit/ghost/fairy/angel/demon/devil" in subject => Spirit
+    spirit=r"^(spirit|ghost|fairy|fairies|angel|demon|devil|satan|soul|phantom|elf|elves|dwarf|vampire|"
+           r"werewolf|mermaid|banshee|the spirit|the ghost|the fairy|the angel|the demon|the devil)\b",
+    # "giant/dragon/troll/monster/ogress/cannibal" in subject => Monster
+    monster=r"^(giant|dragon|troll|monster|ogress|cannibal|cyclop|the giant|the dragon|the troll|the monster)\b",
+    # "witch/sorcerer/magician" in subject => Witch/Sorcerer (for any label)
+    witch=r"^(witch|witches|wizard|sorcerer|sorceress|magician|enchanter|enchantress|"
+          r"the witch|the wizard|the sorcerer)\b",
+)
+_FIX_LABELS = {"deity": "Deity", "spirit": "Spirit", "monster": "Monster", "witch": "Witch/Sorcerer"}
+
 print("\nApplying post-classification corrections ...")
 corrections = 0
 
 for i in being_idx:
-    name = all_rows[i]["motif_name"]
-    chapter = all_rows[i]["chapter_name"]
-    lower = name.lower()
     old = subcategories[i]
-
-    # Fix: "god/goddess/deity" in subject => Deity, not Human
-    if old == "Human" and re.match(r"^(god[sd]?|goddess|deity|creator|the god|the goddess|the creator|demigod|culture hero)\b", lower, re.I):
-        subcategories[i] = "Deity"
-        corrections += 1
-    # Fix: "spirit/ghost/fairy/angel/demon/devil" in subject => Spirit
-    elif old == "Human" and re.match(r"^(spirit|ghost|fairy|fairies|angel|demon|devil|satan|soul|phantom|elf|elves|dwarf|vampire|werewolf|mermaid|banshee|the spirit|the ghost|the fairy|the angel|the demon|the devil)\b", lower, re.I):
-        subcategories[i] = "Spirit"
-        corrections += 1
-    # Fix: "giant/dragon/troll/monster/ogress/cannibal" in subject => Monster
-    elif old == "Human" and re.match(r"^(giant|dragon|troll|monster|ogress|cannibal|cyclop|the giant|the dragon|the troll|the monster)\b", lower, re.I):
-        subcategories[i] = "Monster"
-        corrections += 1
-    # Fix: "witch/sorcerer/magician" in subject => Witch/Sorcerer
-    elif old != "Witch/Sorcerer" and re.match(r"^(witch|witches|wizard|sorcerer|sorceress|magician|enchanter|enchantress|the witch|the wizard|the sorcerer)\b", lower, re.I):
-        subcategories[i] = "Witch/Sorcerer"
-        corrections += 1
+    # Every fix rewrites a Human label, except the witch fix which applies to
+    # any label other than Witch/Sorcerer itself
+    if old == "Witch/Sorcerer":
+        continue
+    lower = motif_names[i].lower()
+    m = _SUBJECT_FIXES.match(lower)
+    if old != "Human":
+        new = "Witch/Sorcerer" if m and m.lastgroup == "witch" else None
+    elif m:
+        new = _FIX_LABELS[m.lastgroup]
     # Fix: animal name in subject position, no human words before it => Animal
-    elif old == "Human" and chapter == "Animals":
-        first_words = set(lower.split()[:3])
-        if not (first_words & _human_subject_words):
-            subcategories[i] = "Animal"
-            corrections += 1
+    elif chapter_names[i] == "Animals":
+        new = "Animal" if _human_subject_words.isdisjoint(lower.split()[:3]) else None
     # Fix: Monsters chapter + monster-related content => Monster (not Human)
-    elif old == "Human" and chapter == "Monsters" and _monster_anywhere.search(lower):
-        subcategories[i] = "Monster"
+    elif chapter_names[i] == "Monsters" and search_anywhere(_monster_anywhere, lower):
+        new = "Monster"
+    else:
+        new = None
+    if new:
+        subcategories[i] = new
         corrections += 1
 
 print(f"  Corrections applied: {corrections:,}")
@@ -451,8 +475,16 @@ print(f"  Corrections applied: {corrections:,}")
 # =====================================================================
 # Step 5: Report
 # =====================================================================
-being_subcats = [subcategories[i] for i in being_idx]
-subcat_counts = Counter(being_subcats)
+# Counts, chapter tallies and the first 12 sample motifs per subcategory, in one pass
+subcat_counts = Counter()
+subcat_chapter = defaultdict(Counter)
+subcat_samples = defaultdict(list)
+for i in being_idx:
+    sc = subcategories[i]
+    subcat_counts[sc] += 1
+    subcat_chapter[sc][chapter_names[i]] += 1
+    if len(subcat_samples[sc]) < 12:
+        subcat_samples[sc].append(motif_names[i])
 
 print(f"\n{'='*70}")
 print("BEING SUBCATEGORY DISTRIBUTION (improved)")
@@ -460,10 +492,6 @@ print(f"{'='*70}")
 for sc, count in subcat_counts.most_common():
     print(f"  {sc:20s}  {count:>6,}  ({100*count/len(being_idx):.1f}%)")
 
-subcat_chapter = defaultdict(Counter)
-for i in being_idx:
-    subcat_chapter[subcategories[i]][all_rows[i]["chapter_name"]] += 1
-
 SUBCAT_DESCRIPTIONS = {
     "Deity":           "Gods, goddesses, creator figures, demigods, culture heroes",
     "Human":           "Ordinary people, royalty, social roles, named humans, heroes",
@@ -480,7 +508,8 @@ report_lines.append("=" * 80)
 report_lines.append(f"\nRule-matched: {rule_matched:,} / {len(being_idx):,} ({100*rule_matched/len(being_idx):.1f}%)")
 report_lines.append(f"Classifier-predicted: {unmatched_being:,} ({100*unmatched_being/len(being_idx):.1f}%)")
 report_lines.append(f"Post-classification corrections: {corrections:,}")
-report_lines.append(f"Classifier 5-fold CV accuracy: {cv_scores.mean():.3f}")
+if CROSS_VALIDATE:
+    report_lines.append(f"Classifier 5-fold CV accuracy: {cv_scores.mean():.3f}")
 
 for sc, count in subcat_counts.most_common():
     report_lines.append(f"\n{'─'*80}")
@@ -491,9 +520,8 @@ for sc, count in subcat_counts.most_common():
     top_ch = subcat_chapter[sc].most_common(5)
     report_lines.append(f"  Top chapters: {', '.join(f'{ch} ({n:,})' for ch, n in top_ch)}")
 
-    samples = [all_rows[i]["motif_name"] for i in being_idx if subcategories[i] == sc][:12]
     report_lines.append(f"  Sample motifs:")
-    for s in samples:
+    for s in subcat_samples[sc]:
         report_lines.append(f"    • {s}")
 
 # Overwrite the Being section in the report
@@ -515,12 +543,13 @@ print("Writing updated tmi_clustered.csv ...")
 out_path = os.path.join(DATA_DIR, "tmi_clustered.csv")
 if "subcategory" not in fieldnames:
     fieldnames = fieldnames + ["subcategory"]
+subcat_col = fieldnames.index("subcategory")
 
 with open(out_path, "w", encoding="utf-8", newline="") as fout:
-    writer = csv.DictWriter(fout, fieldnames=fieldnames)
-    writer.writeheader()
-    for i, row in enumerate(all_rows):
-        row["subcategory"] = subcategories[i]
+    writer = csv.writer(fout)
+    writer.writerow(fieldnames)
+    for row, subcat in zip(all_rows, subcategories):
+        row[subcat_col:subcat_col + 1] = [subcat]
         writer.writerow(row)
 print(f"  Written {out_path}")
 
@@ -558,15 +587,49 @@ plt.savefig(os.path.join(DATA_DIR, "being_subcategories.png"), dpi=150)
 plt.close()
 print("  Written being_subcategories.png")
 
-# UMAP
-print("Vectorizing all motifs for UMAP ...")
-all_texts = [preprocess(r["motif_name"]) + " __CH_" + r["chapter_name"].replace(" ", "_") for r in all_rows]
-vec_all = TfidfVectorizer(max_features=8000, ngram_range=(1, 2), min_df=2, max_df=0.5, sublinear_tf=True)
-X_all = vec_all.fit_transform(all_texts)
-
-print("Running UMAP ...")
-reducer = umap.UMAP(n_components=2, n_neighbors=30, min_dist=0.3, metric="cosine", random_state=42, low_memory=True)
-coords = reducer.fit_transform(X_all)
+# UMAP (on Step 3's TF-IDF matrix)
+# The layout depends only on the TF-IDF matrix and the settings below, so it is
+# cached; re-runs after a rule change that leaves the text alone skip UMAP
+UMAP_CACHE = os.path.join(DATA_DIR, ".being_umap_cache.npz")
+UMAP_SETTINGS = f"svd=100 n_neighbors=30 min_dist=0.3 metric=cosine seed=42 cuml={HAS_CUML}"
+
+def umap_cache_key():
+    h = hashlib.blake2b(UMAP_SETTINGS.encode())
+    for part in (X_all.indptr, X_all.indices, X_all.data):
+        h.update(np.ascontiguousarray(part).tobytes())
+    return h.hexdigest()
+
+cache_key = umap_cache_key()
+coords = None
+if os.path.exists(UMAP_CACHE):
+    with np.load(UMAP_CACHE) as cached:
+        if str(cached["key"]) == cache_key:
+            coords = cached["coords"]
+
+if coords is not None:
+    print("Loading cached UMAP layout (TF-IDF matrix unchanged) ...")
+else:
+    print("Running UMAP ...")
+    # UMAP's neighbor search scales with the input dimension, so project the
+    # 8k-column TF-IDF matrix onto its top 100 components first
+    X_svd = TruncatedSVD(n_components=100, random_state=42).fit_transform(X_all)
+    if HAS_CUML:
+        # The whole layout runs on the GPU
+        coords = CumlUMAP(n_components=2, n_neighbors=30, min_dist=0.3, metric="cosine",
+                          random_state=42).fit_transform(X_svd)
+    else:
+        # Build the k-NN graph up front on all cores; with random_state set UMAP would
+        # otherwise run its own neighbor search single-threaded
+        knn_index = NNDescent(X_svd, n_neighbors=30, metric="cosine", random_state=42,
+                              low_memory=True, n_jobs=-1)
+        knn_indices, knn_dists = knn_index.neighbor_graph
+        reducer = umap.UMAP(n_components=2, n_neighbors=30, min_dist=0.3, metric="cosine", random_state=42,
+                            low_memory=True, precomputed_knn=(knn_indices, knn_dists, knn_index))
+        coords = reducer.fit_transform(X_svd)
+    tmp = UMAP_CACHE + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, key=np.array(cache_key), coords=np.asarray(coords))
+    os.replace(tmp, UMAP_CACHE)
 
 ALL_COLORS = {**SUBCAT_COLORS,
     "Action": "#e74c3c", "Place": "#2ecc71", "Event": "#f39c12",
@@ -577,14 +640,16 @@ CATEGORY_ORDER = ["Human", "Deity", "Animal", "Spirit", "Monster", "Witch/Sorcer
                   "Action", "Place", "Event", "Object", "Origin", "Attribute", "Condition", "Outcome"]
 subcat_arr = np.array(subcategories)
 
+x, y = coords[:, 0], coords[:, 1]
+
 # All categories scatter
 print("Plotting full scatter ...")
 fig, ax = plt.subplots(figsize=(16, 11))
 for cat in reversed(CATEGORY_ORDER):
     mask = subcat_arr == cat
     if mask.sum() == 0: continue
-    ax.scatter(coords[mask, 0], coords[mask, 1], c=ALL_COLORS[cat], label=f"{cat} ({mask.sum():,})",
-               s=1.5, alpha=0.4, edgecolors="none", rasterized=True)
+    plot_points(ax, x[mask], y[mask], ALL_COLORS[cat], size=1.5, alpha=0.4,
+                label=f"{cat} ({mask.sum():,})")
 ax.set_title("TMI Motifs — All Categories (Being split, improved)", fontsize=14, fontweight="bold")
 ax.legend(markerscale=8, fontsize=9, loc="upper right", framealpha=0.9, edgecolor="gray")
 ax.set_xticks([]); ax.set_yticks([])
@@ -600,8 +665,8 @@ for idx, cat in enumerate(CATEGORY_ORDER):
     r, c = divmod(idx, 4)
     ax = axes[r][c]
     mask = subcat_arr == cat
-    ax.scatter(coords[~mask, 0], coords[~mask, 1], c="#e8e8e8", s=0.3, alpha=0.15, edgecolors="none", rasterized=True)
-    ax.scatter(coords[mask, 0], coords[mask, 1], c=ALL_COLORS[cat], s=2, alpha=0.6, edgecolors="none", rasterized=True)
+    plot_points(ax, x[~mask], y[~mask], "#e8e8e8", size=0.3, alpha=0.15)
+    plot_points(ax, x[mask], y[mask], ALL_COLORS[cat], size=2, alpha=0.6)
     ax.set_title(f"{cat}  ({mask.sum():,})", fontsize=12, fontweight="bold", color=ALL_COLORS[cat],
                  path_effects=[pe.withStroke(linewidth=0.5, foreground="black")])
     ax.set_xticks([]); ax.set_yticks([])
@@ -617,13 +682,13 @@ print("  Written cluster_scatter_grid.png")
 # Being-only scatter
 print("Plotting Being-only scatter ...")
 fig, ax = plt.subplots(figsize=(14, 10))
-non_being = np.array([r["category"] != "Being" for r in all_rows])
-ax.scatter(coords[non_being, 0], coords[non_being, 1], c="#e0e0e0", s=0.3, alpha=0.1, edgecolors="none", rasterized=True, label="Other categories")
+plot_points(ax, x[non_being], y[non_being], "#e0e0e0", size=0.3, alpha=0.1,
+            label="Other categories")
 for sc in reversed(["Human", "Deity", "Animal", "Spirit", "Monster", "Witch/Sorcerer"]):
     mask = subcat_arr == sc
     if mask.sum() == 0: continue
-    ax.scatter(coords[mask, 0], coords[mask, 1], c=SUBCAT_COLORS[sc], label=f"{sc} ({mask.sum():,})",
-               s=2, alpha=0.5, edgecolors="none", rasterized=True)
+    plot_points(ax, x[mask], y[mask], SUBCAT_COLORS[sc], size=2, alpha=0.5,
+                label=f"{sc} ({mask.sum():,})")
 ax.set_title("Being Subcategories — improved (non-Being in gray)", fontsize=14, fontweight="bold")
 ax.legend(markerscale=6, fontsize=10, loc="upper right", framealpha=0.9, edgecolor="gray")
 ax.set_xticks([]); ax.set_yticks([])
@@ -8,6 +8,7 @@ Outputs:
   - cluster_scatter_no_being.png : all except Being (to see smaller categories)
 """
 import csv
+import hashlib
 import os
 import re
 
@@ -16,8 +17,18 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.patheffects as pe
 import numpy as np
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
 import umap
+from pynndescent import NNDescent
+
+from scatter_layers import plot_points
+
+try:
+    from cuml.manifold import UMAP as CumlUMAP
+    HAS_CUML = True
+except ImportError:
+    HAS_CUML = False
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 csv.field_size_limit(10 * 1024 * 1024)
@@ -41,31 +52,90 @@ print(f"  {n:,} motifs")
 # ── TF-IDF vectorization ─────────────────────────────────────────────
 print("Vectorizing ...")
 
+_non_token_chars = re.compile(r"[^a-z0-9\s\-]")
+
 def preprocess(name):
-    name = name.lower()
-    name = re.sub(r"[^a-z0-9\s\-]", " ", name)
-    return re.sub(r"\s+", " ", name).strip()
+    # One substitution; str.split() collapses the same whitespace set as \s+, strip included
+    return " ".join(_non_token_chars.sub(" ", name.lower()).split())
 
 texts = [preprocess(nm) + " __CH_" + ch.replace(" ", "_")
          for nm, ch in zip(motif_names, chapter_names)]
 
+# Same features as split_being.py, and kept as a vocabulary TF-IDF for the
+# same reason: HashingVectorizer + TfidfTransformer is ~0.5 s faster here but
+# cannot prune by min_df/max_features, so the matrix gains ~57% more nonzeros
+# and UMAP's neighbor search pays more than the hashing saves. The prune itself
+# is cheap: scikit-learn computes document frequencies with one vectorized
+# reduction, and min_df/max_df/max_features take ~0.1 s of the ~1.4 s fit,
+# most of which is counting n-grams.
 vectorizer = TfidfVectorizer(
     max_features=8000, ngram_range=(1, 2),
     min_df=2, max_df=0.5, sublinear_tf=True,
 )
 tfidf = vectorizer.fit_transform(texts)
+# Only tfidf and the category column are needed from here on; drop the fitted
+# vectorizer and the text columns before UMAP allocates its k-NN graph
+del vectorizer, texts, motif_names, chapter_names
 
 # ── UMAP reduction ───────────────────────────────────────────────────
-print("Running UMAP (this may take a moment) ...")
-reducer = umap.UMAP(
-    n_components=2,
-    n_neighbors=30,
-    min_dist=0.3,
-    metric="cosine",
-    random_state=42,
-    low_memory=True,
-)
-coords = reducer.fit_transform(tfidf)
+# The layout depends only on the TF-IDF matrix and the settings below, so it is
+# cached (as in split_being.py); re-runs that only restyle the plots skip UMAP
+UMAP_CACHE = os.path.join(DATA_DIR, ".cluster_umap_cache.npz")
+UMAP_SETTINGS = f"svd=100 n_neighbors=30 min_dist=0.3 metric=cosine seed=42 cuml={HAS_CUML}"
+
+def umap_cache_key():
+    h = hashlib.blake2b(UMAP_SETTINGS.encode())
+    for part in (tfidf.indptr, tfidf.indices, tfidf.data):
+        h.update(np.ascontiguousarray(part).tobytes())
+    return h.hexdigest()
+
+cache_key = umap_cache_key()
+coords = None
+if os.path.exists(UMAP_CACHE):
+    with np.load(UMAP_CACHE) as cached:
+        if str(cached["key"]) == cache_key:
+            coords = cached["coords"]
+
+if coords is not None:
+    print("Loading cached UMAP layout (TF-IDF matrix unchanged) ...")
+else:
+    print("Running UMAP (this may take a moment) ...")
+    # As in split_being.py: UMAP's neighbor search scales with the input
+    # dimension, so project the 8k-column TF-IDF matrix onto its top 100
+    # components first
+    X_svd = TruncatedSVD(n_components=100, random_state=42).fit_transform(tfidf)
+    if HAS_CUML:
+        # k-NN graph and layout both run on the GPU and hand back host coords
+        # for Matplotlib
+        reducer = CumlUMAP(
+            n_components=2,
+            n_neighbors=30,
+            min_dist=0.3,
+            metric="cosine",
+            random_state=42,
+            output_type="numpy",
+        )
+    else:
+        # Build the k-NN graph up front on all cores; with random_state set
+        # UMAP would otherwise run its own neighbor search single-threaded
+        knn_index = NNDescent(X_svd, n_neighbors=30, metric="cosine", random_state=42,
+                              low_memory=True, n_jobs=-1)
+        knn_indices, knn_dists = knn_index.neighbor_graph
+        reducer = umap.UMAP(
+            n_components=2,
+            n_neighbors=30,
+            min_dist=0.3,
+            metric="cosine",
+            random_state=42,
+            low_memory=True,
+            precomputed_knn=(knn_indices, knn_dists, knn_index),
+        )
+    coords = reducer.fit_transform(X_svd)
+    tmp = UMAP_CACHE + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, key=np.array(cache_key), coords=np.asarray(coords))
+    os.replace(tmp, UMAP_CACHE)
+del tfidf
 print(f"  UMAP done. Shape: {coords.shape}")
 
 # ── Color palette ────────────────────────────────────────────────────
@@ -84,28 +154,65 @@ COLORS = {
     "Outcome":   "#d35400",   # burnt orange
 }
 
-cat_arr = np.array(categories)
+# Categories as small integer codes, not strings: code k is
+# CATEGORY_ORDER[k], and -1 is any category outside it
+CAT_CODE = {cat: k for k, cat in enumerate(CATEGORY_ORDER)}
+cat_codes = np.array([CAT_CODE.get(cat, -1) for cat in categories], dtype=np.int8)
+del categories
+
+# Sort the layout by category code once: category k is then the contiguous
+# slice cat_start[k]:cat_start[k + 1] of x/y, so every plot selects a category
+# by slice (a view) instead of copying through a boolean mask. x and y are
+# separate contiguous float32 arrays, so each selection reads one dense column.
+# (a stable argsort of int8 keys is already a radix sort in NumPy, O(n), and
+# the bounds are the prefix sums of the per-code counts)
+order = np.argsort(cat_codes, kind="stable")
+x = np.ascontiguousarray(coords[order, 0], dtype=np.float32)
+y = np.ascontiguousarray(coords[order, 1], dtype=np.float32)
+del coords
+cat_codes = cat_codes[order]
+# Codes shift by one so the uncategorized -1 rows count first. The same
+# counts give every legend total, so no plot sums a mask
+code_counts = np.bincount(cat_codes + 1, minlength=len(CATEGORY_ORDER) + 1)
+cat_start = np.cumsum(code_counts)
+cat_count = code_counts[1:]
+
+
+def cat_rows(cat):
+    """The slice of x/y holding category cat."""
+    k = CAT_CODE[cat]
+    return slice(cat_start[k], cat_start[k + 1])
+
+# (mpl-scatter-density is not added: it bins the combined plot only, through a
+# special axes projection, and at TMI's ~46k points the marker layers are
+# cheap to draw.)
+
+# Figures stay PNG. Every point layer is already rasterized=True, so a PDF
+# would keep only the axes and text as vectors, but with ~46k points the
+# rasterized layers dominate: PDF output was no smaller and savefig was ~1.4x
+# slower than PNG at the same dpi.
+
+def new_axes():
+    """Single-panel UMAP figure: axis labels set, ticks off."""
+    fig, ax = plt.subplots(figsize=(14, 10), subplot_kw=dict(xticks=[], yticks=[]))
+    ax.set_xlabel("UMAP 1")
+    ax.set_ylabel("UMAP 2")
+    return fig, ax
+
 
 # ── Plot 1: All categories combined ─────────────────────────────────
 print("Plotting combined scatter ...")
-fig, ax = plt.subplots(figsize=(14, 10))
+fig, ax = new_axes()
 
 # Plot smaller categories first so they're not hidden behind Being
 for cat in reversed(CATEGORY_ORDER):
-    mask = cat_arr == cat
-    ax.scatter(
-        coords[mask, 0], coords[mask, 1],
-        c=COLORS[cat], label=f"{cat} ({mask.sum():,})",
-        s=1.5, alpha=0.4, edgecolors="none", rasterized=True,
-    )
+    rows = cat_rows(cat)
+    plot_points(ax, x[rows], y[rows], COLORS[cat], size=1.5, alpha=0.4,
+                label=f"{cat} ({cat_count[CAT_CODE[cat]]:,})")
 
 ax.set_title("TMI Motifs — Semantic Categories (UMAP projection)", fontsize=14, fontweight="bold")
-ax.set_xlabel("UMAP 1")
-ax.set_ylabel("UMAP 2")
 ax.legend(markerscale=8, fontsize=10, loc="upper right",
           framealpha=0.9, edgecolor="gray")
-ax.set_xticks([])
-ax.set_yticks([])
 plt.tight_layout()
 plt.savefig(os.path.join(DATA_DIR, "cluster_scatter_all.png"), dpi=200)
 plt.close()
@@ -113,32 +220,22 @@ print("  Written cluster_scatter_all.png")
 
 # ── Plot 2: Exclude Being to see structure of smaller categories ────
 print("Plotting scatter without Being ...")
-fig, ax = plt.subplots(figsize=(14, 10))
+fig, ax = new_axes()
 
-non_being = cat_arr != "Being"
 # Faint Being in background
-ax.scatter(
-    coords[~non_being, 0], coords[~non_being, 1],
-    c="#e0e0e0", s=0.5, alpha=0.15, edgecolors="none", rasterized=True,
-    label=f"Being ({(~non_being).sum():,}) [background]",
-)
+rows = cat_rows("Being")
+plot_points(ax, x[rows], y[rows], "#e0e0e0", size=0.5, alpha=0.15,
+            label=f"Being ({cat_count[CAT_CODE['Being']]:,}) [background]")
 for cat in reversed(CATEGORY_ORDER):
     if cat == "Being":
         continue
-    mask = cat_arr == cat
-    ax.scatter(
-        coords[mask, 0], coords[mask, 1],
-        c=COLORS[cat], label=f"{cat} ({mask.sum():,})",
-        s=3, alpha=0.5, edgecolors="none", rasterized=True,
-    )
+    rows = cat_rows(cat)
+    plot_points(ax, x[rows], y[rows], COLORS[cat], size=3, alpha=0.5,
+                label=f"{cat} ({cat_count[CAT_CODE[cat]]:,})")
 
 ax.set_title("TMI Motifs — Categories (Being faded to background)", fontsize=14, fontweight="bold")
-ax.set_xlabel("UMAP 1")
-ax.set_ylabel("UMAP 2")
 ax.legend(markerscale=6, fontsize=10, loc="upper right",
           framealpha=0.9, edgecolor="gray")
-ax.set_xticks([])
-ax.set_yticks([])
 plt.tight_layout()
 plt.savefig(os.path.join(DATA_DIR, "cluster_scatter_no_being.png"), dpi=200)
 plt.close()
@@ -149,30 +246,24 @@ print("Plotting per-category grid ...")
 ncats = len(CATEGORY_ORDER)
 ncols = 3
 nrows = 3
-fig, axes = plt.subplots(nrows, ncols, figsize=(18, 16))
+# Ticks are switched off for all nine axes as they are created
+fig, axes = plt.subplots(nrows, ncols, figsize=(18, 16), subplot_kw=dict(xticks=[], yticks=[]))
 
 for idx, cat in enumerate(CATEGORY_ORDER):
     r, c = divmod(idx, ncols)
     ax = axes[r][c]
 
-    mask = cat_arr == cat
+    lo, hi = cat_start[idx], cat_start[idx + 1]
 
-    # Gray background for everything else
-    ax.scatter(
-        coords[~mask, 0], coords[~mask, 1],
-        c="#e8e8e8", s=0.3, alpha=0.2, edgecolors="none", rasterized=True,
-    )
+    # Gray background for everything else: the two slices either side
+    for rest in (slice(0, lo), slice(hi, n)):
+        plot_points(ax, x[rest], y[rest], "#e8e8e8", size=0.3, alpha=0.2)
     # Highlighted category
-    ax.scatter(
-        coords[mask, 0], coords[mask, 1],
-        c=COLORS[cat], s=2, alpha=0.6, edgecolors="none", rasterized=True,
-    )
+    plot_points(ax, x[lo:hi], y[lo:hi], COLORS[cat], size=2, alpha=0.6)
 
-    ax.set_title(f"{cat}  ({mask.sum():,})", fontsize=13, fontweight="bold",
+    ax.set_title(f"{cat}  ({cat_count[idx]:,})", fontsize=13, fontweight="bold",
                  color=COLORS[cat],
                  path_effects=[pe.withStroke(linewidth=0.5, foreground="black")])
-    ax.set_xticks([])
-    ax.set_yticks([])
 
 plt.suptitle("TMI Motifs — Each Category Highlighted", fontsize=16, fontweight="bold", y=1.01)
 plt.tight_layout()